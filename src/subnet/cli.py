@@ -1,17 +1,29 @@
 import asyncio
-import signal
 import sys
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from communex._common import get_node_url
 from communex.client import CommuneClient
 from communex.compat.key import classic_load_key
 from loguru import logger
 from src.subnet.validator.database.models.miner_discovery import MinerDiscoveryManager
+from src.subnet.validator.fanout import MinerFanOut
+from src.subnet.validator.metagraph import MetagraphCache
+from src.subnet.validator.miner_blacklist import MinerBlacklist
+from src.subnet.validator.miner_state import MinerStateCache
+from src.subnet.validator.database.models.miner_blacklist import MinerBlacklistManager
+from src.subnet.validator.module_client_pool import ModuleClientPool
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
 from src.subnet.validator.database.session_manager import DatabaseSessionManager, run_migrations
 from src.subnet.validator.llm.factory import LLMFactory
+from src.subnet.validator.llm.sentiment_service import SentimentService
+from src.subnet.validator.database.models.tweet_sentiment import TweetSentimentManager
 from src.subnet.validator.scoring import ScoreCalculator
-from src.subnet.validator.twitter import TwitterService, TwitterClient, RoundRobinBearerTokenProvider
+from src.subnet.validator.similarity_index import TweetSimilarityIndex
+from src.subnet.validator.twitter import TwitterService, TwitterClient
+from src.subnet.validator.twitter.token_scheduler import BearerTokenScheduler
+from src.subnet.validator.twitter.user_cache import create_user_cache
+from src.subnet.validator.weight_submitter import WeightSubmitter
 from src.subnet.validator.weights_storage import WeightsStorage
 from src.subnet.validator._config import load_environment, SettingsManager
 from src.subnet.validator.validator import Validator
@@ -55,20 +67,53 @@ if __name__ == "__main__":
     )
 
     c_client = CommuneClient(get_node_url(use_testnet=(environment == 'testnet')))
-    weights_storage = WeightsStorage(settings.WEIGHTS_FILE_NAME)
+    weights_storage = WeightsStorage(settings.WEIGHTS_FILE_NAME, history_size=settings.WEIGHTS_HISTORY_SIZE)
 
     session_manager = DatabaseSessionManager()
     session_manager.init(settings.DATABASE_URL)
     run_migrations()
 
     miner_discovery_manager = MinerDiscoveryManager(session_manager)
-    miner_receipt_manager = MinerReceiptManager(session_manager)
-    score_calculator = ScoreCalculator(miner_discovery_manager, miner_receipt_manager)
+    similarity_index = None
+    if settings.SIMILARITY_INDEX_ENABLED:
+        similarity_index = TweetSimilarityIndex(
+            threshold=settings.SIMILARITY_THRESHOLD,
+        )
+    miner_receipt_manager = MinerReceiptManager(
+        session_manager,
+        similarity_index=similarity_index,
+    )
+    score_calculator = ScoreCalculator(miner_discovery_manager, miner_receipt_manager, snapshot_max_age=settings.NORMALIZATION_SNAPSHOT_MAX_AGE)
 
     llm = LLMFactory.create_llm(settings)
-    twitter_round_robbin_token_provider = RoundRobinBearerTokenProvider(settings)
-    twitter_client = TwitterClient(twitter_round_robbin_token_provider)
-    twitter_service = TwitterService(twitter_client)
+    sentiment_service = SentimentService(
+        llm,
+        max_concurrency=settings.PIPELINE_LLM_CONCURRENCY,
+        batch_size=settings.LLM_BATCH_SIZE,
+        cache_size=settings.SENTIMENT_CACHE_SIZE,
+        sentiment_store=TweetSentimentManager(session_manager),
+        fallback_llm=LLMFactory.create_llm(settings, settings.LLM_FALLBACK_TYPE) if settings.LLM_FALLBACK_TYPE else None,
+        first_pass_llm=LLMFactory.create_llm(settings, settings.LLM_FIRST_PASS_TYPE) if settings.LLM_FIRST_PASS_TYPE else None,
+        first_pass_margin=settings.LLM_FIRST_PASS_MARGIN,
+        llm_timeout=settings.LLM_TIMEOUT,
+    )
+    twitter_token_scheduler = BearerTokenScheduler(settings)
+    twitter_client = TwitterClient(
+        twitter_token_scheduler,
+        max_concurrency=settings.TWITTER_MAX_CONCURRENCY,
+        request_timeout=settings.TWITTER_REQUEST_TIMEOUT,
+    )
+    twitter_service = TwitterService(twitter_client, user_cache=create_user_cache(settings))
+
+    weight_submitter = WeightSubmitter(
+        c_client,
+        keypair,
+        settings.NET_UID,
+        max_retries=settings.WEIGHTS_VOTE_MAX_RETRIES,
+        backoff=settings.WEIGHTS_VOTE_BACKOFF,
+    )
+
+    module_client_pool = ModuleClientPool(keypair, max_connections=settings.MINER_QUERY_MAX_IN_FLIGHT)
 
     validator = Validator(
         keypair,
@@ -78,23 +123,44 @@ if __name__ == "__main__":
         miner_discovery_manager,
         miner_receipt_manager,
         score_calculator,
-        llm,
+        sentiment_service,
         twitter_service,
         query_timeout=settings.QUERY_TIMEOUT,
+        miner_fanout=MinerFanOut(
+            max_in_flight=settings.MINER_QUERY_MAX_IN_FLIGHT,
+            max_deadline=settings.QUERY_TIMEOUT,
+            min_deadline=settings.MINER_QUERY_MIN_TIMEOUT,
+            hedge=settings.MINER_QUERY_HEDGE,
+        ),
+        module_client_pool=module_client_pool,
+        metagraph_cache=MetagraphCache(c_client, settings.NET_UID, max_age=settings.METAGRAPH_MAX_AGE),
+        miner_blacklist=MinerBlacklist(
+            MinerBlacklistManager(session_manager),
+            ttl=timedelta(seconds=settings.MINER_BLACKLIST_TTL) if settings.MINER_BLACKLIST_TTL is not None else None,
+        ),
+        weight_submitter=weight_submitter,
+        miner_state_cache=MinerStateCache(max_pending_posts=settings.MINER_POSTS_PAGE_SIZE),
     )
 
 
-    def shutdown_handler(signal_num, frame):
-        logger.info("Received shutdown signal, stopping...")
-        validator.terminate_event.set()
-        settings_manager.stop_reloader()
+    def shutdown_handler():
+        # Joining the reloader thread would block the event loop
+        threading.Thread(target=settings_manager.stop_reloader, daemon=True).start()
         logger.debug("Shutdown handler finished")
 
-    signal.signal(signal.SIGINT, shutdown_handler)
-    signal.signal(signal.SIGTERM, shutdown_handler)
+    async def run_validator():
+        validator.scheduler = validator.create_scheduler(settings)
+        validator.scheduler.install_signal_handlers(shutdown_handler)
+        weight_submitter.start()
+        try:
+            await validator.validation_loop(settings)
+        finally:
+            await twitter_service.close()
+            await module_client_pool.close()
+            await asyncio.to_thread(weight_submitter.stop, timeout=30)
 
     try:
-        asyncio.run(validator.validation_loop(settings))
+        asyncio.run(run_validator())
     except KeyboardInterrupt:
         logger.info("Validator loop interrupted")
 
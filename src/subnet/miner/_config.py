@@ -21,6 +21,7 @@ class MinerSettings(BaseSettings):
     PORT: int = 9962
     WORKERS: int = 1
     DATABASE_URL: str
+    TWITTER_POSTS_MAX_LIMIT: int = 1000  # most posts served by one paginated twitter_posts call
 
     USER_ID: str
     DASHBOARD_USER_NAME: str
@@ -1,9 +1,10 @@
 from fastapi import HTTPException
-from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, func, update, delete
+from typing import Optional
+from sqlalchemy import Column, Index, Integer, String, DateTime, UniqueConstraint, func, update, delete, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.future import select
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.subnet.miner.database import OrmBase
 from src.subnet.miner.database.base_model import to_dict
 from src.subnet.miner.database.session_manager import DatabaseSessionManager
@@ -19,9 +20,22 @@ class TwitterPost(OrmBase):
     dispatch_after = Column(DateTime, nullable=False)
     __table_args__ = (
         UniqueConstraint('tweet_id', name='uq_tweet_id'),
+        Index(None, 'dispatch_after', 'id'),
     )
 
 
+EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(dispatch_after: datetime, post_id: int) -> str:
+    return f"{(dispatch_after - EPOCH) // timedelta(microseconds=1)}-{post_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    microseconds, post_id = cursor.split("-")
+    return EPOCH + timedelta(microseconds=int(microseconds)), int(post_id)
+
+
 class TwitterPostManager:
     def __init__(self, session_manager: DatabaseSessionManager):
         self.session_manager = session_manager
@@ -39,6 +53,34 @@ class TwitterPostManager:
 
             return [to_dict(tweet) for tweet in result.scalars().all()]
 
+    async def get_dispatched_tweets(self, cursor: Optional[str] = None, since: Optional[datetime] = None, limit: int = 100) -> tuple[list[tuple[str, str]], Optional[str]]:
+        """
+        Dispatched posts after `cursor` (or dispatched after `since`) as (user_id, tweet_id) pairs, in dispatch
+        order, with the cursor to pass for the next ones. Uses the (dispatch_after, id) index, so the cost of a
+        page does not grow with the number of posts served before it.
+
+        The cursor is keyed on `dispatch_after`, so a post added with, or edited to, a `dispatch_after` before
+        the cursor of a validator is never served to it. Posts meant to be served should be scheduled in the
+        future.
+        """
+        query = select(TwitterPost.id, TwitterPost.user_id, TwitterPost.tweet_id, TwitterPost.dispatch_after).where(
+            TwitterPost.dispatch_after <= datetime.utcnow(),
+        )
+        if cursor is not None:
+            dispatch_after, post_id = decode_cursor(cursor)
+            query = query.where(tuple_(TwitterPost.dispatch_after, TwitterPost.id) > tuple_(dispatch_after, post_id))
+        elif since is not None:
+            query = query.where(TwitterPost.dispatch_after > since)
+
+        async with self.session_manager.session() as session:
+            result = await session.execute(query.order_by(TwitterPost.dispatch_after, TwitterPost.id).limit(limit))
+            rows = result.all()
+
+        if not rows:
+            return [], cursor
+        last = rows[-1]
+        return [(row.user_id, row.tweet_id) for row in rows], encode_cursor(last.dispatch_after, last.id)
+
     async def get_tweets(self, page: int = 1, page_size: int = 10):
         async with self.session_manager.session() as session:
             offset = (page - 1) * page_size
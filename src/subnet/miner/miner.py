@@ -1,6 +1,6 @@
 import signal
-from datetime import datetime
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional, Union
 
 from communex._common import get_node_url
 from communex.client import CommuneClient
@@ -12,7 +12,7 @@ from starlette.middleware.cors import CORSMiddleware
 from src.subnet.miner._config import MinerSettings, load_environment
 from src.subnet.miner.database.models.twitter_post import TwitterPostManager
 from src.subnet.miner.database.session_manager import DatabaseSessionManager, run_migrations
-from src.subnet.protocol import TwitterPost
+from src.subnet.protocol import TwitterPost, TwitterPostsPage
 
 
 class Miner(Module):
@@ -23,12 +23,37 @@ class Miner(Module):
         self.twitter_post_manager = twitter_post_manager
 
     @endpoint
-    async def twitter_posts(self) -> List[TwitterPost]:
-        results = await twitter_post_manager.get_last_tweets()
-        logger.debug(f"Found {len(results)} new tweets")
-
-        discoveries = [TwitterPost(**tweet) for tweet in results]
-        return discoveries
+    async def twitter_posts(self, cursor: Optional[str] = None, since: Optional[str] = None, limit: Optional[int] = None) -> Union[TwitterPostsPage, List[TwitterPost]]:
+        """
+        Posts dispatched after `cursor` (as returned by the previous page) or after the `since` ISO timestamp, at
+        most `limit` of them. Without any parameter every dispatched post is returned as a list, as validators
+        predating pagination expect.
+        """
+        if cursor is None and since is None and limit is None:
+            results = await self.twitter_post_manager.get_last_tweets()
+            logger.debug(f"Found {len(results)} new tweets")
+
+            discoveries = [TwitterPost(**tweet) for tweet in results]
+            return discoveries
+
+        limit = min(max(limit if limit is not None else self.settings.TWITTER_POSTS_MAX_LIMIT, 0), self.settings.TWITTER_POSTS_MAX_LIMIT)
+        if limit == 0:
+            return TwitterPostsPage(posts=[], cursor=cursor)
+
+        try:
+            since_datetime = None
+            if since is not None:
+                since_datetime = datetime.fromisoformat(since.replace("Z", "+00:00"))
+                if since_datetime.tzinfo is not None:
+                    since_datetime = since_datetime.astimezone(timezone.utc).replace(tzinfo=None)
+            posts, next_cursor = await self.twitter_post_manager.get_dispatched_tweets(cursor=cursor, since=since_datetime, limit=limit)
+        except (ValueError, OverflowError) as e:
+            # Malformed cursor or since, e.g. from another miner instance: serve from the start rather than failing forever
+            logger.warning(f"Invalid twitter posts cursor, serving from the start", cursor=cursor, since=since, error=e)
+            posts, next_cursor = await self.twitter_post_manager.get_dispatched_tweets(limit=limit)
+
+        logger.debug(f"Found {len(posts)} new tweets", cursor=cursor, since=since, next_cursor=next_cursor)
+        return TwitterPostsPage(posts=posts, cursor=next_cursor)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -6,6 +7,15 @@ class TwitterPost(BaseModel):
     tweet_id: str
 
 
+class TwitterPostsPage(BaseModel):
+    """Page of the paginated `twitter_posts` endpoint, posts as (user_id, tweet_id) pairs."""
+    posts: List[tuple[str, str]]
+    cursor: Optional[str] = None
+
+    def to_twitter_posts(self) -> List[TwitterPost]:
+        return [TwitterPost(user_id=user_id, tweet_id=tweet_id) for user_id, tweet_id in self.posts]
+
+
 class TwitterPostMetadata(BaseModel):
     user_id: str
     user_name: str
@@ -1,4 +1,5 @@
 import sys
+from typing import Optional
 from loguru import logger
 from pydantic import ConfigDict
 from dotenv import load_dotenv
@@ -31,6 +32,10 @@ logger.add(
 
 class ValidatorSettings(BaseSettings):
     ITERATION_INTERVAL: int
+    SCHEDULE_ALIGN: str = "wall_clock"  # start steps on multiples of ITERATION_INTERVAL in "wall_clock" time or chain "block"s
+    SCHEDULE_OVERRUN: str = "skip"  # after a step overruns its interval "skip" the missed ticks or "queue" a catch-up step
+    BLOCK_TIME: float = 8.0  # seconds between chain blocks, used by block aligned schedules
+    SHUTDOWN_GRACE_PERIOD: int = 30  # seconds the running step gets to finish on shutdown before it is cancelled
     MAX_ALLOWED_WEIGHTS: int
     NET_UID: int
     VALIDATOR_KEY: str
@@ -39,17 +44,51 @@ class ValidatorSettings(BaseSettings):
     WORKERS: int = 4
 
     WEIGHTS_FILE_NAME: str = 'weights.pkl'
+    WEIGHTS_HISTORY_SIZE: int = 5  # past weight files kept for rollback
+    WEIGHTS_VOTE_MAX_RETRIES: int = 5
+    WEIGHTS_VOTE_BACKOFF: float = 2.0  # seconds before the first retry, doubled on every further one
     DATABASE_URL: str
     API_RATE_LIMIT: int
     REDIS_URL: str
 
     QUERY_TIMEOUT: int   # cross check query timeout
+    MINER_BLACKLIST_TTL: Optional[int] = 24 * 60 * 60  # seconds a miner stays blacklisted, None never expires
+    METAGRAPH_MAX_AGE: int = 120  # seconds a metagraph snapshot is served before a step waits for a fresh one
+    METAGRAPH_REFRESH_LEAD: int = 30  # seconds before the next step the metagraph is refreshed, below METAGRAPH_MAX_AGE
+    MINER_POSTS_PAGE_SIZE: int = 100  # posts kept waiting to be scored per paginated miner, and most requested per step
+    MINER_QUERY_MAX_IN_FLIGHT: int = 32
+    MINER_QUERY_MIN_TIMEOUT: int = 5  # lower bound of the adaptive per-miner deadline
+    MINER_QUERY_HEDGE: bool = False  # resend calls which take much longer than the miner usually does
+
+    NORMALIZATION_SNAPSHOT_MAX_AGE: int = 0  # seconds a scoring normalization snapshot is reused, 0 reloads it every step
+
+    SIMILARITY_THRESHOLD: float = 0.3  # tweets less similar than this are ignored by the in-memory similarity index
+    SIMILARITY_INDEX_ENABLED: bool = False  # answer similarity checks from an in-memory MinHash/LSH index
 
     LLM_API_KEY: str
     LLM_TYPE: str
+    LLM_BATCH_SIZE: int = 1  # tweets scored per sentiment request, above 1 tweets of other miners share a prompt and can prompt-inject each other's scores
+    LLM_TIMEOUT: Optional[float] = None  # seconds before a sentiment request is given to the fallback
+    LLM_FALLBACK_TYPE: Optional[str] = None  # e.g. lexicon, scores batches LLM_TYPE fails on
+    LLM_FIRST_PASS_TYPE: Optional[str] = None  # e.g. lexicon, only unclear tweets are sent on to LLM_TYPE
+    LLM_FIRST_PASS_MARGIN: float = 30  # first pass scores at least this far from neutral 50 are kept
+    SENTIMENT_CACHE_SIZE: int = 10000
 
     TWITTER_BEARER_TOKENS: str
-
+    TWITTER_MAX_CONCURRENCY: int = 8
+    TWITTER_REQUEST_TIMEOUT: int = 10
+    TWITTER_RATE_LIMIT_CALLS: int = 15  # per token and endpoint, until response headers say otherwise
+    TWITTER_RATE_LIMIT_PERIOD: int = 15 * 60
+
+    TWITTER_USER_CACHE_BACKEND: str = "memory"  # memory, redis or none
+    TWITTER_USER_CACHE_TTL: int = 6 * 60 * 60
+    TWITTER_USER_CACHE_STALE_TTL: int = 24 * 60 * 60  # served while refreshing in the background
+    TWITTER_USER_CACHE_MAX_SIZE: int = 10000
+
+    PIPELINE_QUEUE_SIZE: int = 64
+    PIPELINE_BATCH_WAIT: float = 2.0  # how long the twitter stages wait to fill a lookup batch
+    PIPELINE_LLM_CONCURRENCY: int = 4
+    PIPELINE_DB_CONCURRENCY: int = 4
 
     model_config = ConfigDict(
         extra='ignore',
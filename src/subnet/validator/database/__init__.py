@@ -12,5 +12,8 @@ from .models.miner_discovery import MinerDiscovery
 from .models.miner_receipt import MinerReceipt
 from .session_manager import db_manager, get_session
 from .models.api_key import ApiKey
+from .models.daily_metric_maxima import DailyMetricMaxima
+from .models.tweet_sentiment import TweetSentiment
+from .models.miner_blacklist import MinerBlacklistEntry
 
-__all__ = ["OrmBase", "get_session", "db_manager", "MinerDiscovery", "MinerReceipt", "ApiKey"]
\ No newline at end of file
+__all__ = ["OrmBase", "get_session", "db_manager", "MinerDiscovery", "MinerReceipt", "ApiKey", "DailyMetricMaxima", "TweetSentiment", "MinerBlacklistEntry"]
\ No newline at end of file
@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import Column, Date, BigInteger, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.declarative import declarative_base
+from src.subnet.validator.database import OrmBase
+
+Base = declarative_base()
+
+MAX_METRICS_WINDOW = timedelta(days=30)
+
+
+class DailyMetricMaxima(OrmBase):
+    """
+    Per day maxima of the user and tweet metrics used to normalize scores.
+
+    Maintained on every miner discovery and receipt write, so the rolling 30 day maxima are read
+    from at most 31 rows instead of being aggregated over the raw tables. NULL means nothing was seen that day.
+    """
+    __tablename__ = 'daily_metric_maxima'
+    day = Column(Date, primary_key=True)
+    user_followers = Column(BigInteger, nullable=True)
+    user_following = Column(BigInteger, nullable=True)
+    user_tweets = Column(BigInteger, nullable=True)
+    user_likes = Column(BigInteger, nullable=True)
+    user_listed = Column(BigInteger, nullable=True)
+    tweet_retweets = Column(BigInteger, nullable=True)
+    tweet_replies = Column(BigInteger, nullable=True)
+    tweet_likes = Column(BigInteger, nullable=True)
+    tweet_quotes = Column(BigInteger, nullable=True)
+    tweet_bookmarks = Column(BigInteger, nullable=True)
+    tweet_impressions = Column(BigInteger, nullable=True)
+
+
+async def upsert_daily_metric_maxima(session: AsyncSession, day: date, metrics: dict[str, int]):
+    """
+    Raises the maxima of `day` to `metrics`, keyed by DailyMetricMaxima column name.
+    Runs in the caller's transaction, so the aggregate commits or rolls back with the row it was derived from.
+    """
+    stmt = insert(DailyMetricMaxima).values(day=day, **metrics)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day'],
+        # GREATEST skips NULLs, so the first value seen for a metric on a day is taken as is
+        set_={column: func.greatest(getattr(DailyMetricMaxima, column), stmt.excluded[column]) for column in metrics}
+    )
+    await session.execute(stmt)
+
+
+async def get_rolling_metric_maxima(session: AsyncSession, columns: list[str]) -> dict:
+    """
+    Maxima of `columns` over the last 30 days, None for metrics without any value in the window.
+    """
+    since = (datetime.utcnow() - MAX_METRICS_WINDOW).date()
+    result = await session.execute(
+        select(*[func.max(getattr(DailyMetricMaxima, column)).label(column) for column in columns])
+        .where(DailyMetricMaxima.day >= since)
+    )
+    row = result.fetchone()
+    return {column: getattr(row, column) for column in columns}
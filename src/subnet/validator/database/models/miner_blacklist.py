@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, String, DateTime, select, delete, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.declarative import declarative_base
+from src.subnet.validator.database import OrmBase
+from src.subnet.validator.database.session_manager import DatabaseSessionManager
+
+Base = declarative_base()
+
+
+class MinerBlacklistEntry(OrmBase):
+    __tablename__ = 'miner_blacklist'
+    miner_key = Column(String, primary_key=True)
+    reason = Column(String, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=True, index=True)
+
+
+class MinerBlacklistManager:
+    def __init__(self, session_manager: DatabaseSessionManager):
+        self.session_manager = session_manager
+
+    async def store_entries(self, entries: list[tuple[str, str, Optional[datetime]]]):
+        """
+        Upserts (miner_key, reason, expires_at) entries, a NULL expires_at never expires.
+        """
+        if not entries:
+            return
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                timestamp = datetime.utcnow()
+                stmt = insert(MinerBlacklistEntry).values([
+                    {
+                        'miner_key': miner_key,
+                        'reason': reason,
+                        'timestamp': timestamp,
+                        'expires_at': expires_at,
+                    }
+                    for miner_key, reason, expires_at in entries
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['miner_key'],
+                    set_={column: stmt.excluded[column] for column in ['reason', 'timestamp', 'expires_at']}
+                )
+                await session.execute(stmt)
+
+    async def get_active_entries(self) -> list[MinerBlacklistEntry]:
+        async with self.session_manager.session() as session:
+            result = await session.execute(
+                select(MinerBlacklistEntry).where(
+                    or_(MinerBlacklistEntry.expires_at.is_(None), MinerBlacklistEntry.expires_at > datetime.utcnow())
+                )
+            )
+            return list(result.scalars().all())
+
+    async def remove_expired_entries(self):
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                await session.execute(
+                    delete(MinerBlacklistEntry).where(MinerBlacklistEntry.expires_at <= datetime.utcnow())
+                )
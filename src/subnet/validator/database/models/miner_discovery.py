@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, update, insert, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, update, insert, func, bindparam
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.future import select
 from sqlalchemy.dialects.postgresql import insert
@@ -8,6 +8,7 @@ from sqlalchemy import delete
 from datetime import datetime, timedelta
 from src.subnet.validator.database import OrmBase
 from src.subnet.validator.database.base_model import to_dict
+from src.subnet.validator.database.models.daily_metric_maxima import upsert_daily_metric_maxima, get_rolling_metric_maxima
 from src.subnet.validator.database.session_manager import DatabaseSessionManager
 
 Base = declarative_base()
@@ -37,13 +38,14 @@ class MinerDiscoveryManager:
     async def store_miner_metadata(self, uid: int, miner_key: str, miner_name: str, user_id: str, user_name: str, followers: int, following: int, tweets: int, likes: int, listed: int):
         async with self.session_manager.session() as session:
             async with session.begin():
+                timestamp = datetime.utcnow()
                 stmt = insert(MinerDiscovery).values(
                     uid=uid,
                     miner_key=miner_key,
                     miner_name=miner_name,
                     user_id=user_id,
                     user_name=user_name,
-                    timestamp=datetime.utcnow(),
+                    timestamp=timestamp,
                     followers=followers,
                     following=following,
                     tweets=tweets,
@@ -54,7 +56,7 @@ class MinerDiscoveryManager:
                     set_={
                         'uid': uid,
                         'user_id': user_id,
-                        'timestamp': datetime.utcnow(),
+                        'timestamp': timestamp,
                         'followers': followers,
                         'following': following,
                         'tweets': tweets,
@@ -63,6 +65,80 @@ class MinerDiscoveryManager:
                     }
                 )
                 await session.execute(stmt)
+                await upsert_daily_metric_maxima(session, timestamp.date(), {
+                    'user_followers': followers,
+                    'user_following': following,
+                    'user_tweets': tweets,
+                    'user_likes': likes,
+                    'user_listed': listed,
+                })
+
+    async def store_miner_metadata_batch(self, miners_metadata: list[dict]):
+        """
+        Upserts the metadata of many miners in one statement.
+        Every dict holds the arguments of `store_miner_metadata` by name; for a miner listed more than once the last entry wins.
+        """
+        if not miners_metadata:
+            return
+
+        # ON CONFLICT DO UPDATE can not touch the same row twice within one statement
+        miners_metadata = list({miner_metadata['miner_key']: miner_metadata for miner_metadata in miners_metadata}.values())
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                timestamp = datetime.utcnow()
+                stmt = insert(MinerDiscovery).values([
+                    {
+                        'uid': miner_metadata['uid'],
+                        'miner_key': miner_metadata['miner_key'],
+                        'miner_name': miner_metadata['miner_name'],
+                        'user_id': miner_metadata['user_id'],
+                        'user_name': miner_metadata['user_name'],
+                        'timestamp': timestamp,
+                        'followers': miner_metadata['followers'],
+                        'following': miner_metadata['following'],
+                        'tweets': miner_metadata['tweets'],
+                        'likes': miner_metadata['likes'],
+                        'listed': miner_metadata['listed'],
+                    }
+                    for miner_metadata in miners_metadata
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['miner_key'],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in ['uid', 'user_id', 'timestamp', 'followers', 'following', 'tweets', 'likes', 'listed']
+                    }
+                )
+                await session.execute(stmt)
+                await upsert_daily_metric_maxima(session, timestamp.date(), {
+                    'user_followers': max(miner_metadata['followers'] for miner_metadata in miners_metadata),
+                    'user_following': max(miner_metadata['following'] for miner_metadata in miners_metadata),
+                    'user_tweets': max(miner_metadata['tweets'] for miner_metadata in miners_metadata),
+                    'user_likes': max(miner_metadata['likes'] for miner_metadata in miners_metadata),
+                    'user_listed': max(miner_metadata['listed'] for miner_metadata in miners_metadata),
+                })
+
+    async def update_miner_ranks(self, miner_ranks: list[tuple[str, str, float]]):
+        """
+        Updates name and emission of many miners, given as (miner_key, miner_name, emission), in one executemany round trip.
+        """
+        if not miner_ranks:
+            return
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                # Core table update, an ORM update with a parameter list would be a bulk update by primary key
+                stmt = update(MinerDiscovery.__table__).where(
+                    MinerDiscovery.__table__.c.miner_key == bindparam('b_miner_key')
+                ).values(
+                    miner_name=bindparam('b_miner_name'),
+                    emission=bindparam('b_emission')
+                )
+                await session.execute(stmt, [
+                    {'b_miner_key': miner_key, 'b_miner_name': miner_name, 'b_emission': emission}
+                    for miner_key, miner_name, emission in miner_ranks
+                ])
 
     async def update_miner_rank(self, miner_key: str, miner_name: float, emission: float):
         async with self.session_manager.session() as session:
@@ -77,27 +153,14 @@ class MinerDiscoveryManager:
 
     async def get_max_metrics_last_month(self):
         async with self.session_manager.session() as session:
-            now = datetime.utcnow()
-            one_month_ago = now - timedelta(days=30)
-            result = await session.execute(
-                select(
-                    func.max(MinerDiscovery.followers).label('followers'),
-                    func.max(MinerDiscovery.following).label('following'),
-                    func.max(MinerDiscovery.tweets).label('tweets'),
-                    func.max(MinerDiscovery.likes).label('likes'),
-                    func.max(MinerDiscovery.listed).label('listed')
-                )
-                .where(MinerDiscovery.timestamp >= one_month_ago)
-            )
-
-            row = result.fetchone()
+            row = await get_rolling_metric_maxima(session, ['user_followers', 'user_following', 'user_tweets', 'user_likes', 'user_listed'])
 
             return {
-                "followers": row.followers if row.followers is not None else 100000,
-                "following": row.following if row.following is not None else 10000,
-                "tweets": row.tweets if row.tweets is not None else 10000,
-                "likes": row.likes if row.likes is not None else 100000,
-                "listed": row.listed if row.listed is not None else 1000
+                "followers": row['user_followers'] if row['user_followers'] is not None else 100000,
+                "following": row['user_following'] if row['user_following'] is not None else 10000,
+                "tweets": row['user_tweets'] if row['user_tweets'] is not None else 10000,
+                "likes": row['user_likes'] if row['user_likes'] is not None else 100000,
+                "listed": row['user_listed'] if row['user_listed'] is not None else 1000
             }
 
     async def get_discoveries_by_miner_key(self, miner_key: Optional[str], user_id: Optional[str], user_name: Optional[str], page: int = 1, page_size: int = 10):
@@ -1,15 +1,20 @@
 from typing import Optional
 from pydantic import BaseModel
 from sqlalchemy import Column, String, DateTime, update, insert, BigInteger, Boolean, UniqueConstraint, Text, select, \
-    func, text, Float
+    func, text, Float, any_, bindparam, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import insert, ARRAY
 from datetime import datetime, timedelta
 from src.subnet.validator.database import OrmBase
+from src.subnet.validator.database.models.daily_metric_maxima import upsert_daily_metric_maxima, get_rolling_metric_maxima
 from src.subnet.validator.database.session_manager import DatabaseSessionManager
+from src.subnet.validator.similarity_index import TweetSimilarityIndex, similarity_cutoff
 
 Base = declarative_base()
 
+# Keeps a multi-row insert well below the 32767 bind parameters a Postgres statement can have
+RECEIPTS_PER_INSERT = 1000
+
 
 class MinerReceipt(OrmBase):
     __tablename__ = 'miner_receipts'
@@ -29,20 +34,23 @@ class MinerReceipt(OrmBase):
     tweet_content = Column(Text, nullable=False)
     score = Column(Float, nullable=False)
     similarity = Column(Float, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     __table_args__ = (
         UniqueConstraint('miner_key', 'tweet_id', name='uq_miner_key_tweet_id'),
+        Index('ix__miner_receipts__tweet_content_trgm', 'tweet_content', postgresql_using='gist', postgresql_ops={'tweet_content': 'gist_trgm_ops'}),
     )
 
 
 class MinerReceiptManager:
-    def __init__(self, session_manager: DatabaseSessionManager):
+    def __init__(self, session_manager: DatabaseSessionManager, similarity_index: Optional[TweetSimilarityIndex] = None):
         self.session_manager = session_manager
+        self.similarity_index = similarity_index
 
     async def store_miner_receipt(self, miner_key: str, miner_name: str, user_id: str, user_name: str, tweet_id: str, tweet_content:str,  tweet_created_at: datetime, tweet_retweet_count: int, tweet_reply_count: int, tweet_like_count: int, tweet_quote_count: int, tweet_bookmark_count: int, tweet_impression_count: int, score: int, similarity: float):
         async with self.session_manager.session() as session:
             async with session.begin():
+                timestamp = datetime.utcnow()
                 stmt = insert(MinerReceipt).values(
                     miner_key=miner_key,
                     miner_name=miner_name,
@@ -60,28 +68,132 @@ class MinerReceiptManager:
                     tweet_impression_count=tweet_impression_count,
                     score=score,
                     similarity=similarity,
-                    timestamp=datetime.utcnow()
-                ).on_conflict_do_nothing()
-                await session.execute(stmt)
+                    timestamp=timestamp
+                ).on_conflict_do_nothing().returning(MinerReceipt.id)
+                result = await session.execute(stmt)
+
+                # Receipts which already existed were counted when they were first stored
+                if result.scalar() is not None:
+                    await upsert_daily_metric_maxima(session, timestamp.date(), {
+                        'tweet_retweets': tweet_retweet_count,
+                        'tweet_replies': tweet_reply_count,
+                        'tweet_likes': tweet_like_count,
+                        'tweet_quotes': tweet_quote_count,
+                        'tweet_bookmarks': tweet_bookmark_count,
+                        'tweet_impressions': tweet_impression_count,
+                    })
+
+        if self.similarity_index is not None:
+            self.similarity_index.add(tweet_id, tweet_content)
+
+    async def store_miner_receipts(self, receipts: list[dict]):
+        """
+        Stores many receipts in one transaction, with multi-row inserts of up to RECEIPTS_PER_INSERT rows.
+        Every dict holds the arguments of `store_miner_receipt` by name; receipts which already exist are skipped.
+        """
+        if not receipts:
+            return
+
+        inserted_tweet_ids = set()
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                timestamp = datetime.utcnow()
+                for start in range(0, len(receipts), RECEIPTS_PER_INSERT):
+                    stmt = insert(MinerReceipt).values([
+                        {
+                            'miner_key': receipt['miner_key'],
+                            'miner_name': receipt['miner_name'],
+                            'user_id': receipt['user_id'],
+                            'user_name': receipt['user_name'],
+                            'tweet_id': receipt['tweet_id'],
+                            'tweet_content': receipt['tweet_content'],
+                            'tweet_created_at': receipt['tweet_created_at'],
+                            'tweet_retweet_count': receipt['tweet_retweet_count'],
+                            'tweet_reply_count': receipt['tweet_reply_count'],
+                            'tweet_like_count': receipt['tweet_like_count'],
+                            'tweet_quote_count': receipt['tweet_quote_count'],
+                            'tweet_bookmark_count': receipt['tweet_bookmark_count'],
+                            'tweet_impression_count': receipt['tweet_impression_count'],
+                            'score': receipt['score'],
+                            'similarity': receipt['similarity'],
+                            'timestamp': timestamp,
+                        }
+                        for receipt in receipts[start:start + RECEIPTS_PER_INSERT]
+                    ]).on_conflict_do_nothing().returning(MinerReceipt.tweet_id)
+                    result = await session.execute(stmt)
+                    inserted_tweet_ids.update(result.scalars().all())
+
+                # Receipts which already existed were counted when they were first stored
+                inserted = [receipt for receipt in receipts if receipt['tweet_id'] in inserted_tweet_ids]
+                if inserted:
+                    await upsert_daily_metric_maxima(session, timestamp.date(), {
+                        'tweet_retweets': max(receipt['tweet_retweet_count'] for receipt in inserted),
+                        'tweet_replies': max(receipt['tweet_reply_count'] for receipt in inserted),
+                        'tweet_likes': max(receipt['tweet_like_count'] for receipt in inserted),
+                        'tweet_quotes': max(receipt['tweet_quote_count'] for receipt in inserted),
+                        'tweet_bookmarks': max(receipt['tweet_bookmark_count'] for receipt in inserted),
+                        'tweet_impressions': max(receipt['tweet_impression_count'] for receipt in inserted),
+                    })
+
+        if self.similarity_index is not None:
+            for receipt in receipts:
+                self.similarity_index.add(receipt['tweet_id'], receipt['tweet_content'])
+
+    async def get_scored_tweet_ids(self, tweet_ids: set[str]) -> set[str]:
+        if not tweet_ids:
+            return set()
 
-    async def check_if_tweet_was_scored(self, tweet_id: str) -> bool:
         async with self.session_manager.session() as session:
             result = await session.execute(
-                select(MinerReceipt).where(MinerReceipt.tweet_id == tweet_id)
+                select(MinerReceipt.tweet_id).where(
+                    MinerReceipt.tweet_id == any_(bindparam("tweet_ids", list(tweet_ids), type_=ARRAY(String)))
+                )
             )
-            return result.scalar() is not None
+            return set(result.scalars().all())
+
+    async def get_all_scored_tweet_ids(self) -> set[str]:
+        async with self.session_manager.session() as session:
+            result = await session.execute(select(MinerReceipt.tweet_id))
+            return set(result.scalars().all())
+
+    async def load_similarity_index(self):
+        if self.similarity_index is None:
+            return
+
+        since = similarity_cutoff()
+        async with self.session_manager.session() as session:
+            result = await session.execute(
+                select(MinerReceipt.tweet_id, MinerReceipt.tweet_content, MinerReceipt.timestamp)
+                .where(MinerReceipt.timestamp >= since)
+                .order_by(MinerReceipt.timestamp)
+            )
+            for row in result:
+                self.similarity_index.add(row.tweet_id, row.tweet_content, row.timestamp)
+
+    async def expire_similarity_index(self):
+        if self.similarity_index is not None:
+            self.similarity_index.expire()
 
     async def check_tweet_similarity(self, tweet_content) -> float:
+        """
+        Returns the highest trigram similarity to a receipt since the start of last month.
+        `<->` is the trigram distance, 1 - similarity, so ordering by it finds the same receipt as ordering by
+        similarity while the KNN search walks the trigram index instead of scoring every receipt.
+        When an in-memory similarity index is configured it answers instead, without touching the database.
+        """
+        if self.similarity_index is not None:
+            return self.similarity_index.query(tweet_content)
+
         async with self.session_manager.session() as session:
             query = text("""
                 SELECT similarity(tweet_content, :tweet_content) as similarity_score
                     FROM miner_receipts
                     WHERE timestamp >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '1 month'
-                    ORDER BY similarity_score DESC
+                    ORDER BY tweet_content <-> :tweet_content
                     LIMIT 1;
             """)
 
-            result = await session.execute(query, {"tweet_content": tweet_content} )
+            result = await session.execute(query, {"tweet_content": tweet_content})
             ratio = result.scalar()
             if ratio is None:
                 return 0
@@ -126,28 +238,13 @@ class MinerReceiptManager:
 
     async def get_max_metrics_last_month_receipt(self):
         async with self.session_manager.session() as session:
-            # Calculate the date range for the last month
-            now = datetime.utcnow()
-            one_month_ago = now - timedelta(days=30)
-
-            result = await session.execute(
-                select(
-                    func.max(MinerReceipt.tweet_retweet_count).label('retweets'),
-                    func.max(MinerReceipt.tweet_reply_count).label('replies'),
-                    func.max(MinerReceipt.tweet_like_count).label('likes'),
-                    func.max(MinerReceipt.tweet_quote_count).label('quotes'),
-                    func.max(MinerReceipt.tweet_bookmark_count).label('bookmarks'),
-                    func.max(MinerReceipt.tweet_impression_count).label('impressions')
-                )
-                .where(MinerReceipt.timestamp >= one_month_ago)  # Filter for the last month
-            )
+            row = await get_rolling_metric_maxima(session, ['tweet_retweets', 'tweet_replies', 'tweet_likes', 'tweet_quotes', 'tweet_bookmarks', 'tweet_impressions'])
 
-            row = result.fetchone()
             return {
-                "retweets": row.retweets if row.retweets is not None else 10000,
-                "replies": row.replies if row.replies is not None else 5000,
-                "likes": row.likes if row.likes is not None else 100000,
-                "quotes": row.quotes if row.quotes is not None else 2000,
-                "bookmarks": row.bookmarks if row.bookmarks is not None else 5000,
-                "impressions": row.impressions if row.impressions is not None else 1000000,
+                "retweets": row['tweet_retweets'] if row['tweet_retweets'] is not None else 10000,
+                "replies": row['tweet_replies'] if row['tweet_replies'] is not None else 5000,
+                "likes": row['tweet_likes'] if row['tweet_likes'] is not None else 100000,
+                "quotes": row['tweet_quotes'] if row['tweet_quotes'] is not None else 2000,
+                "bookmarks": row['tweet_bookmarks'] if row['tweet_bookmarks'] is not None else 5000,
+                "impressions": row['tweet_impressions'] if row['tweet_impressions'] is not None else 1000000,
             }
\ No newline at end of file
@@ -0,0 +1,59 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Float, DateTime, select, any_, bindparam, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+from sqlalchemy.ext.declarative import declarative_base
+from src.subnet.validator.database import OrmBase
+from src.subnet.validator.database.session_manager import DatabaseSessionManager
+
+Base = declarative_base()
+
+
+class TweetSentiment(OrmBase):
+    __tablename__ = 'tweet_sentiments'
+    content_hash = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    score = Column(Float, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('content_hash', 'model', 'prompt_version'),
+    )
+
+
+class TweetSentimentManager:
+    def __init__(self, session_manager: DatabaseSessionManager):
+        self.session_manager = session_manager
+
+    async def get_sentiments(self, content_hashes: list[str], model: str, prompt_version: str) -> dict[str, float]:
+        if not content_hashes:
+            return {}
+
+        async with self.session_manager.session() as session:
+            result = await session.execute(
+                select(TweetSentiment.content_hash, TweetSentiment.score).where(
+                    TweetSentiment.content_hash == any_(bindparam("content_hashes", list(content_hashes), type_=ARRAY(String))),
+                    TweetSentiment.model == model,
+                    TweetSentiment.prompt_version == prompt_version,
+                )
+            )
+            return {row.content_hash: row.score for row in result}
+
+    async def store_sentiments(self, scores: dict[str, float], model: str, prompt_version: str):
+        if not scores:
+            return
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                timestamp = datetime.utcnow()
+                stmt = insert(TweetSentiment).values([
+                    {
+                        'content_hash': content_hash,
+                        'model': model,
+                        'prompt_version': prompt_version,
+                        'score': score,
+                        'timestamp': timestamp,
+                    }
+                    for content_hash, score in scores.items()
+                ]).on_conflict_do_nothing()
+                await session.execute(stmt)
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+from loguru import logger
+
+
+class MinerFanOut:
+    """
+    Queries miners with a bounded number of requests in flight and yields results in completion order.
+
+    Every miner gets a deadline derived from its own recent latency (EWMA), clamped between `min_deadline`
+    and `max_deadline`. When hedging is enabled, a call still running after `hedge_multiplier` times the
+    miner's usual latency is sent a second time and the first response wins.
+    """
+
+    def __init__(
+            self,
+            max_in_flight: int,
+            max_deadline: float,
+            min_deadline: float = 5.0,
+            deadline_multiplier: float = 3.0,
+            hedge: bool = False,
+            hedge_multiplier: float = 1.5,
+            ewma_alpha: float = 0.3,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_deadline = max_deadline
+        self.min_deadline = min_deadline
+        self.deadline_multiplier = deadline_multiplier
+        self.hedge = hedge
+        self.hedge_multiplier = hedge_multiplier
+        self.ewma_alpha = ewma_alpha
+        self.latencies: dict[str, float] = {}
+
+    def get_deadline(self, miner_key: str) -> float:
+        latency = self.latencies.get(miner_key)
+        if latency is None:
+            return self.max_deadline
+        return min(max(latency * self.deadline_multiplier, self.min_deadline), self.max_deadline)
+
+    def _record_latency(self, miner_key: str, latency: float):
+        previous = self.latencies.get(miner_key)
+        if previous is None:
+            self.latencies[miner_key] = latency
+        else:
+            self.latencies[miner_key] = self.ewma_alpha * latency + (1 - self.ewma_alpha) * previous
+
+    def _record_timeout(self, miner_key: str, deadline: float):
+        # Count the deadline as the observed latency, so a miner which recovers earns its time back gradually
+        self._record_latency(miner_key, deadline)
+
+    async def _call_with_hedge(self, miner_key: str, call: Callable[[float], Awaitable[Any]], deadline: float) -> Any:
+        latency = self.latencies.get(miner_key)
+        hedge_delay = latency * self.hedge_multiplier if latency is not None else None
+        if not self.hedge or hedge_delay is None or hedge_delay >= deadline:
+            return await asyncio.wait_for(call(deadline), timeout=deadline)
+
+        start_time = time.time()
+        tasks = {asyncio.create_task(call(deadline))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                logger.debug(f"Hedging slow miner call", miner_key=miner_key, hedge_delay=hedge_delay)
+                remaining = deadline - (time.time() - start_time)
+                tasks.add(asyncio.create_task(call(remaining)))
+
+            while tasks:
+                remaining = deadline - (time.time() - start_time)
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, tasks = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not tasks:
+                    # Every attempt failed, surface the last error
+                    raise done.pop().exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(self, miners: Iterable[Any], key: Callable[[Any], str], call: Callable[[Any, float], Awaitable[Any]]) -> AsyncIterator[tuple[Any, Optional[Any], Optional[Exception]]]:
+        """
+        Calls `call(miner, timeout)` for every miner and yields `(miner, result, error)` as calls complete.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def run(miner):
+            miner_key = key(miner)
+            deadline = self.get_deadline(miner_key)
+            async with semaphore:
+                start_time = time.time()
+                try:
+                    result = await self._call_with_hedge(miner_key, lambda timeout: call(miner, timeout), deadline)
+                    self._record_latency(miner_key, time.time() - start_time)
+                    return miner, result, None
+                except asyncio.TimeoutError as e:
+                    logger.info(f"Miner call exceeded its deadline", miner_key=miner_key, deadline=deadline)
+                    self._record_timeout(miner_key, deadline)
+                    return miner, None, e
+                except Exception as e:
+                    # Failures count as latency samples too, e.g. a client side timeout reports the full deadline
+                    self._record_latency(miner_key, time.time() - start_time)
+                    return miner, None, e
+
+        tasks = [asyncio.create_task(run(miner)) for miner in miners]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
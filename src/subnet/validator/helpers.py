@@ -36,6 +36,14 @@ def extract_address(string: str):
     return re.search(IP_REGEX, string)
 
 
+def fix_unset_addresses(modules_adresses: dict[int, str]) -> dict[int, str]:
+    for id, addr in modules_adresses.items():
+        if addr.startswith('None'):
+            port = addr.split(':')[1]
+            modules_adresses[id] = f'0.0.0.0:{port}'
+    return modules_adresses
+
+
 def get_ip_port(modules_adresses: dict[int, str]):
     filtered_addr = {id: extract_address(addr) for id, addr in modules_adresses.items()}
     ip_port = {
@@ -1,8 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Optional
 from src.subnet.validator._config import ValidatorSettings
 
 
 class BaseLLM(ABC):
+    # Identify the scores an LLM produces, stored sentiments are only reused for the same model and prompt version
+    model_name: str = "unknown"
+    prompt_version: str = "unknown"
+
     @abstractmethod
     def __init__(self, settings: ValidatorSettings) -> None:
         """
@@ -15,3 +21,11 @@ class BaseLLM(ABC):
         Get sentiment of tweet
         """
         pass
+
+    async def get_tweet_sentiments(self, tweet_texts: list[str]) -> list[Optional[float]]:
+        """
+        Get sentiment of several tweets, in order, None for the tweets which could not be scored.
+        Runs get_tweet_sentiment in worker threads unless the LLM can score a batch in one request.
+        """
+        results = await asyncio.gather(*[asyncio.to_thread(self.get_tweet_sentiment, tweet_text) for tweet_text in tweet_texts], return_exceptions=True)
+        return [None if isinstance(result, BaseException) else result for result in results]
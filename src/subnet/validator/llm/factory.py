@@ -1,17 +1,22 @@
+from typing import Optional
 from src.subnet.validator._config import ValidatorSettings
 from src.subnet.validator.llm.base_llm import BaseLLM
+from src.subnet.validator.llm.lexicon import LexiconLLM
 from src.subnet.validator.llm.openai import OpenAILLM
 
 LLM_TYPE_OPENAI = "openai"
+LLM_TYPE_LEXICON = "lexicon"
 
 class LLMFactory:
     @classmethod
-    def create_llm(cls, settings: ValidatorSettings) -> BaseLLM:
+    def create_llm(cls, settings: ValidatorSettings, llm_type: Optional[str] = None) -> BaseLLM:
+        llm_type = llm_type or settings.LLM_TYPE
         llm_class = {
             LLM_TYPE_OPENAI: OpenAILLM,
-        }.get(settings.LLM_TYPE)
+            LLM_TYPE_LEXICON: LexiconLLM,
+        }.get(llm_type)
 
         if llm_class is None:
-            raise ValueError(f"Unsupported LLM Type: {settings.LLM_TYPE}")
+            raise ValueError(f"Unsupported LLM Type: {llm_type}")
 
-        return llm_class(settings=settings)
\ No newline at end of file
+        return llm_class(settings=settings)
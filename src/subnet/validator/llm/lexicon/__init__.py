@@ -0,0 +1,94 @@
+import re
+import numpy as np
+from loguru import logger
+from src.subnet.validator._config import ValidatorSettings
+from src.subnet.validator.encryption import generate_hash
+from src.subnet.validator.llm.base_llm import BaseLLM
+from src.subnet.validator.llm.prompt_reader import read_local_file
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "without"}
+# Words following a negation within this window have their valence flipped and damped
+NEGATION_WINDOW = 3
+NEGATION_SCALAR = -0.74
+
+BOOSTERS = {
+    "very": 0.293, "really": 0.293, "extremely": 0.293, "super": 0.293, "so": 0.293, "incredibly": 0.293,
+    "totally": 0.293, "absolutely": 0.293, "highly": 0.293, "most": 0.293,
+    "slightly": -0.293, "somewhat": -0.293, "barely": -0.293, "kinda": -0.293, "little": -0.293,
+}
+
+# Maps a summed valence to (-1, 1), the way VADER normalizes its compound score
+NORMALIZATION_ALPHA = 15
+
+
+class LexiconLLM(BaseLLM):
+    """
+    Local, deterministic sentiment scorer based on a valence lexicon.
+
+    Costs no API call and scores thousands of tweets per second on a CPU, which makes it usable as the
+    main sentiment backend, as a fallback when the remote LLM is slow or rate limited, or as a first pass
+    that only sends tweets without a clear sentiment to the remote LLM.
+    """
+
+    model_name = "lexicon"
+
+    def __init__(self, settings: ValidatorSettings) -> None:
+        self.settings = settings
+
+        lexicon_content = read_local_file("lexicon/lexicon.tsv")
+        if not lexicon_content:
+            raise Exception("Failed to read sentiment lexicon")
+
+        self.lexicon = self._parse_lexicon(lexicon_content)
+        self.prompt_version = generate_hash(lexicon_content)[:16]
+
+    @staticmethod
+    def _parse_lexicon(content: str) -> dict[str, float]:
+        lexicon = {}
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            word, valence = line.split('\t')
+            lexicon[word] = float(valence)
+        return lexicon
+
+    def _get_valence(self, tweet_text: str) -> float:
+        words = WORD_PATTERN.findall(tweet_text.lower().replace("n't", " not"))
+
+        total = 0.0
+        for index, word in enumerate(words):
+            valence = self.lexicon.get(word)
+            if valence is None:
+                continue
+
+            previous_words = words[max(0, index - NEGATION_WINDOW):index]
+            if previous_words:
+                booster = BOOSTERS.get(previous_words[-1])
+                if booster is not None:
+                    valence += booster if valence > 0 else -booster
+            if any(previous_word in NEGATIONS for previous_word in previous_words):
+                valence *= NEGATION_SCALAR
+
+            total += valence
+        return total
+
+    def _score(self, tweet_texts: list[str]) -> list[float]:
+        valences = np.array([self._get_valence(tweet_text) for tweet_text in tweet_texts], dtype=np.float64)
+        normalized = valences / np.sqrt(valences * valences + NORMALIZATION_ALPHA)
+        # Same scale as the classification prompt: 1 to 100, neutral near 50
+        scores = np.clip(np.round(50 + 49 * normalized), 1, 100)
+        return [float(score) if tweet_text else 0.0 for tweet_text, score in zip(tweet_texts, scores)]
+
+    def get_tweet_sentiment(self, tweet_text) -> float:
+        if not tweet_text:
+            logger.warning("The tweet text is empty")
+            return False
+
+        return self._score([tweet_text])[0]
+
+    async def get_tweet_sentiments(self, tweet_texts: list[str]) -> list[float]:
+        # Fast enough to run on the event loop, no worker threads needed
+        return self._score(tweet_texts)
@@ -1,6 +1,11 @@
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 from src.subnet.validator._config import ValidatorSettings
+from src.subnet.validator.encryption import generate_hash
 from src.subnet.validator.llm.base_llm import BaseLLM
 from src.subnet.validator.llm.prompt_reader import read_local_file
 from src.subnet.validator.llm.utils import split_messages_into_chunks
@@ -8,40 +13,86 @@ from loguru import logger
 
 
 class OpenAILLM(BaseLLM):
+    model_name = "gpt-4o"
+
     def __init__(self, settings: ValidatorSettings) -> None:
         self.settings = settings
-        self.chat_gpt4o = ChatOpenAI(api_key=settings.LLM_API_KEY, model="gpt-4o", temperature=0)
+        self.chat_gpt4o = ChatOpenAI(api_key=settings.LLM_API_KEY, model=self.model_name, temperature=0)
         self.MAX_TOKENS = 128000
 
-    def get_tweet_sentiment(self, tweet_text) -> float:
-        validation_template_path = f"openai/prompts/classification_prompt.txt"
-        prompt_template = read_local_file(validation_template_path)
-
-        if not prompt_template:
+        self.prompt_template = read_local_file("openai/prompts/classification_prompt.txt")
+        if not self.prompt_template:
             raise Exception("Failed to read prompt template")
 
+        self.batch_prompt_template = read_local_file("openai/prompts/batch_classification_prompt.txt")
+        if not self.batch_prompt_template:
+            raise Exception("Failed to read batch prompt template")
+
+        # Any edit to either prompt invalidates previously stored sentiments
+        self.prompt_version = generate_hash([self.prompt_template, self.batch_prompt_template])[:16]
+
+    def _build_messages(self, tweet_text) -> Optional[list]:
+        """Prompt message chunks of a tweet, None when the tweet text is empty."""
         if not tweet_text:
             logger.warning("The tweet text is empty")
-            return False
+            return None
 
         try:
-            substituted_template = prompt_template.replace('{tweet_text}', tweet_text)
+            substituted_template = self.prompt_template.replace('{tweet_text}', tweet_text)
         except Exception as e:
             logger.error(f"Error during prompt/query substitution: {e}")
             raise Exception("Error formatting validation prompt with prompt and query") from e
 
-        try:
-            messages = [SystemMessage(content=substituted_template)]
-            message_chunks = split_messages_into_chunks(messages)
-            ai_responses = []
-            for chunk in message_chunks:
-                ai_message = self.chat_gpt4o.invoke(chunk)
-                ai_responses.append(ai_message.content)
-            combined_response = "\n".join(ai_responses)
-
-            score = combined_response.lower()
-            return float(score)
+        return split_messages_into_chunks([SystemMessage(content=substituted_template)])
 
+    @staticmethod
+    @contextmanager
+    def _validation_errors():
+        try:
+            yield
         except Exception as e:
             logger.error(f"LlmQuery validation error: {e}")
             raise Exception("LLM_ERROR_VALIDATION_FAILED")
+
+    @staticmethod
+    def _parse_sentiment(ai_responses: list[str]) -> float:
+        combined_response = "\n".join(ai_responses)
+        return float(combined_response.lower())
+
+    def get_tweet_sentiment(self, tweet_text) -> float:
+        message_chunks = self._build_messages(tweet_text)
+        if message_chunks is None:
+            return False
+
+        with self._validation_errors():
+            return self._parse_sentiment([self.chat_gpt4o.invoke(chunk).content for chunk in message_chunks])
+
+    async def _aget_tweet_sentiment(self, tweet_text) -> float:
+        message_chunks = self._build_messages(tweet_text)
+        if message_chunks is None:
+            return False
+
+        with self._validation_errors():
+            return self._parse_sentiment([(await self.chat_gpt4o.ainvoke(chunk)).content for chunk in message_chunks])
+
+    async def get_tweet_sentiments(self, tweet_texts: list[str]) -> list[Optional[float]]:
+        if len(tweet_texts) == 1:
+            return [await self._aget_tweet_sentiment(tweet_texts[0])]
+
+        substituted_template = self.batch_prompt_template.replace('{tweet_texts}', json.dumps(tweet_texts, ensure_ascii=False))
+
+        try:
+            ai_message = await self.chat_gpt4o.ainvoke([SystemMessage(content=substituted_template)])
+            content = ai_message.content.strip()
+            # The model sometimes wraps the array in a markdown code block
+            content = content[content.find('['):content.rfind(']') + 1]
+            scores = [float(score) for score in json.loads(content)]
+            if len(scores) != len(tweet_texts):
+                raise ValueError(f"Expected {len(tweet_texts)} scores, got {len(scores)}")
+            return scores
+
+        except Exception as e:
+            logger.warning(f"Batch sentiment request failed, scoring tweets one by one", error=e, batch_size=len(tweet_texts))
+            results = await asyncio.gather(*[self._aget_tweet_sentiment(tweet_text) for tweet_text in tweet_texts], return_exceptions=True)
+            # A tweet failing on its own only loses its own score
+            return [None if isinstance(result, BaseException) else result for result in results]
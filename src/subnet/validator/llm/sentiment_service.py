@@ -0,0 +1,186 @@
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+from loguru import logger
+from src.subnet.validator.database.models.tweet_sentiment import TweetSentimentManager
+from src.subnet.validator.encryption import generate_hash
+from src.subnet.validator.llm.base_llm import BaseLLM
+
+
+class SentimentService:
+    """
+    Async front of an LLM for tweet sentiment.
+
+    Tweets are scored in micro-batches of up to `batch_size` per LLM request, with at most `max_concurrency`
+    requests in flight. Scores are cached by tweet text hash in an LRU bounded cache and, when a
+    `sentiment_store` is given, persisted for the LLM's model and prompt version, so a text is only sent
+    to the LLM once across restarts and replays.
+
+    A `first_pass_llm`, typically a local one, scores every batch first and only tweets it scores within
+    `first_pass_margin` of neutral are sent on to `llm`. A `fallback_llm` scores the batches `llm` fails
+    on or does not answer within `llm_timeout` seconds, and the tweets it could not score.
+
+    Batches put several tweets in one prompt, possibly from different miners, so one tweet can try to
+    prompt-inject the scores of the others. `batch_size` defaults to 1, scoring each tweet in isolation.
+    """
+
+    def __init__(
+            self,
+            llm: BaseLLM,
+            max_concurrency: int = 4,
+            batch_size: int = 1,
+            cache_size: int = 10000,
+            sentiment_store: Optional[TweetSentimentManager] = None,
+            fallback_llm: Optional[BaseLLM] = None,
+            first_pass_llm: Optional[BaseLLM] = None,
+            first_pass_margin: float = 30,
+            llm_timeout: Optional[float] = None,
+    ):
+        self.llm = llm
+        self.sentiment_store = sentiment_store
+        self.fallback_llm = fallback_llm
+        self.first_pass_llm = first_pass_llm
+        self.first_pass_margin = first_pass_margin
+        self.llm_timeout = llm_timeout
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: OrderedDict[str, float] = OrderedDict()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.first_pass_scored = 0
+        self.fallback_scored = 0
+
+    def _get_cached(self, text_hash: str) -> Optional[float]:
+        score = self._cache.get(text_hash)
+        if score is not None:
+            self._cache.move_to_end(text_hash)
+        return score
+
+    def _set_cached(self, text_hash: str, score: float):
+        self._cache[text_hash] = score
+        self._cache.move_to_end(text_hash)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    async def _run_llm(llm: BaseLLM, batch: list[tuple[str, str]], timeout: Optional[float] = None) -> dict[str, float]:
+        scores = await asyncio.wait_for(llm.get_tweet_sentiments([tweet_text for _, tweet_text in batch]), timeout=timeout)
+        return {text_hash: float(score) for (text_hash, _), score in zip(batch, scores) if score is not None}
+
+    async def _accept(self, llm: BaseLLM, results: dict[str, float]):
+        for text_hash, score in results.items():
+            self._set_cached(text_hash, score)
+
+        if self.sentiment_store is not None and results:
+            try:
+                await self.sentiment_store.store_sentiments(results, llm.model_name, llm.prompt_version)
+            except Exception as e:
+                logger.warning(f"Failed to store tweet sentiments", error=e)
+
+    async def _score_batch(self, batch: list[tuple[str, str]]) -> dict[str, float]:
+        results = {}
+        async with self.semaphore:
+            if self.first_pass_llm is not None:
+                try:
+                    first_pass = await self._run_llm(self.first_pass_llm, batch)
+                    confident = {text_hash: score for text_hash, score in first_pass.items() if abs(score - 50) >= self.first_pass_margin}
+                    await self._accept(self.first_pass_llm, confident)
+                    results.update(confident)
+                    self.first_pass_scored += len(confident)
+                    batch = [item for item in batch if item[0] not in confident]
+                except Exception as e:
+                    logger.warning(f"First pass sentiment failed", error=e, batch_size=len(batch))
+
+            if not batch:
+                return results
+
+            try:
+                scores = await self._run_llm(self.llm, batch, self.llm_timeout)
+                await self._accept(self.llm, scores)
+                results.update(scores)
+                batch = [item for item in batch if item[0] not in scores]
+                if not batch:
+                    return results
+                if self.fallback_llm is None:
+                    logger.error(f"Failed to get some tweet sentiments", failed=len(batch))
+                    return results
+                logger.warning(f"Failed to get some tweet sentiments, using fallback", failed=len(batch))
+            except Exception as e:
+                if self.fallback_llm is None:
+                    logger.error(f"Failed to get tweet sentiments", error=e, batch_size=len(batch))
+                    return results
+                logger.warning(f"Failed to get tweet sentiments, using fallback", error=e, batch_size=len(batch))
+
+            try:
+                scores = await self._run_llm(self.fallback_llm, batch)
+                await self._accept(self.fallback_llm, scores)
+                results.update(scores)
+                self.fallback_scored += len(scores)
+            except Exception as e:
+                logger.error(f"Fallback failed to get tweet sentiments", error=e, batch_size=len(batch))
+        return results
+
+    async def _load_stored(self, text_hashes: list[str]) -> dict[str, float]:
+        if self.sentiment_store is None or not text_hashes:
+            return {}
+
+        try:
+            stored = await self.sentiment_store.get_sentiments(text_hashes, self.llm.model_name, self.llm.prompt_version)
+        except Exception as e:
+            logger.warning(f"Failed to read stored tweet sentiments", error=e)
+            return {}
+
+        for text_hash, score in stored.items():
+            self._set_cached(text_hash, score)
+        return stored
+
+    async def get_tweet_sentiments(self, tweet_texts: list[str]) -> list[Optional[float]]:
+        """
+        Returns the sentiment of every tweet in order, None for tweets the LLM failed to score.
+        """
+        text_hashes = [generate_hash(tweet_text) for tweet_text in tweet_texts]
+
+        scores: dict[str, float] = {}
+        missing: dict[str, str] = {}
+        for text_hash, tweet_text in zip(text_hashes, tweet_texts):
+            if text_hash in scores or text_hash in missing:
+                continue
+            score = self._get_cached(text_hash)
+            if score is not None:
+                scores[text_hash] = score
+                self.hits += 1
+            else:
+                missing[text_hash] = tweet_text
+
+        stored = await self._load_stored(list(missing.keys()))
+        scores.update(stored)
+        self.store_hits += len(stored)
+        for text_hash in stored:
+            del missing[text_hash]
+        self.misses += len(missing)
+
+        missing_items = list(missing.items())
+        batches = [missing_items[i:i + self.batch_size] for i in range(0, len(missing_items), self.batch_size)]
+        for batch_scores in await asyncio.gather(*[self._score_batch(batch) for batch in batches]):
+            scores.update(batch_scores)
+
+        return [scores.get(text_hash) for text_hash in text_hashes]
+
+    async def get_tweet_sentiment(self, tweet_text: str) -> Optional[float]:
+        return (await self.get_tweet_sentiments([tweet_text]))[0]
+
+    def log_stats(self):
+        lookups = self.hits + self.store_hits + self.misses
+        hit_rate = round((self.hits + self.store_hits) / lookups, 3) if lookups else 0
+        logger.info(
+            f"Sentiment service",
+            cached=len(self._cache),
+            hits=self.hits,
+            store_hits=self.store_hits,
+            misses=self.misses,
+            hit_rate=hit_rate,
+            first_pass_scored=self.first_pass_scored,
+            fallback_scored=self.fallback_scored,
+        )
@@ -1,19 +1,44 @@
+from functools import lru_cache
 from langchain_core.messages import AIMessage
-from transformers import GPT2Tokenizer
 
-tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
+
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    """
+    GPT-2 tokenizer, loaded on first use.
+    Importing transformers and loading the vocabulary is slow and may need the network, so it is
+    deferred until a text is actually long enough to need an exact token count.
+    """
+    from transformers import GPT2TokenizerFast
+
+    return GPT2TokenizerFast.from_pretrained("gpt2")
+
+
+def estimate_max_tokens(text: str) -> int:
+    """
+    Upper bound of the GPT-2 token count of `text`.
+    GPT-2 is a byte level BPE, every token covers at least one UTF-8 byte.
+    """
+    return len(text.encode('utf-8'))
 
 
 def split_messages_into_chunks(messages, max_tokens: int = 1024):
+    # Short texts, e.g. a tweet in a prompt, can never need a split; skip the tokenizer entirely
+    if sum(estimate_max_tokens(message.content) for message in messages) <= max_tokens:
+        return [[AIMessage(message.content) for message in messages]] if messages else []
+
+    tokenizer = get_tokenizer()
     chunks = []
     current_chunk = []
     current_tokens = 0
 
     for message in messages:
         message_tokens = tokenizer.encode(message.content, truncation=False)
+        was_split = False
 
         # If adding this message exceeds max_tokens, split the message
         while current_tokens + len(message_tokens) > max_tokens:
+            was_split = True
             # Calculate the remaining tokens space in the current chunk
             remaining_tokens = max_tokens - current_tokens
 
@@ -28,8 +53,9 @@ def split_messages_into_chunks(messages, max_tokens: int = 1024):
             current_tokens = 0
             message_tokens = message_tokens[remaining_tokens:]
 
-        # Add the rest of the message to the current chunk
-        current_chunk.append(AIMessage(tokenizer.decode(message_tokens, clean_up_tokenization_spaces=False)))
+        # Add the rest of the message to the current chunk, a message which was not split is kept as is
+        rest_content = tokenizer.decode(message_tokens, clean_up_tokenization_spaces=False) if was_split else message.content
+        current_chunk.append(AIMessage(rest_content))
         current_tokens += len(message_tokens)
 
     # Add the last chunk if it has any messages
@@ -40,8 +66,8 @@ def split_messages_into_chunks(messages, max_tokens: int = 1024):
 
 
 def get_message_token_count(message):
-    tokens = tokenizer.encode(message)
+    tokens = get_tokenizer().encode(message)
 
     print(f'gpt2 tokens {len(tokens)}')
 
-    return len(tokens)
\ No newline at end of file
+    return len(tokens)
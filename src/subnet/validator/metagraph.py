@@ -0,0 +1,92 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, cast
+from communex.client import CommuneClient  # type: ignore
+from communex.misc import get_map_modules
+from loguru import logger
+from .helpers import extract_address, fix_unset_addresses
+
+
+@dataclass
+class MetagraphSnapshot:
+    block: int
+    modules: dict[str, dict[str, Any]]
+    addresses: dict[int, str]
+    ip_ports: dict[int, list[str]]
+    fetched_at: float = field(default_factory=time.time)
+
+
+class MetagraphCache:
+    """
+    Keeps the subnet modules and their addresses between validation steps.
+
+    The chain is only queried again once it produced a new block and addresses that did not change keep their
+    parsed ip and port. `refresh` is meant to run as scheduler maintenance shortly before each step, so steps
+    normally start from a ready snapshot instead of waiting for chain queries. Snapshots older than `max_age`
+    seconds are refreshed before being served.
+    """
+
+    def __init__(self, client: CommuneClient, netuid: int, max_age: float = 120):
+        self.client = client
+        self.netuid = netuid
+        self.max_age = max_age
+        self._snapshot: Optional[MetagraphSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.fetches = 0
+        self.skipped_fetches = 0
+
+    def _get_block_number(self) -> Optional[int]:
+        block = self.client.get_block()
+        if block is None:
+            return None
+        return block["header"]["number"]
+
+    async def get_block_number(self) -> Optional[int]:
+        try:
+            return await asyncio.to_thread(self._get_block_number)
+        except Exception as e:
+            logger.warning(f"Failed to get block number", error=e)
+            return None
+
+    def _parse_ip_ports(self, addresses: dict[int, str]) -> dict[int, list[str]]:
+        previous = self._snapshot
+        ip_ports = {}
+        for uid, address in addresses.items():
+            if previous is not None and previous.addresses.get(uid) == address:
+                if uid in previous.ip_ports:
+                    ip_ports[uid] = previous.ip_ports[uid]
+                continue
+            match = extract_address(address)
+            if match is not None:
+                ip_ports[uid] = match.group(0).split(":")
+        return ip_ports
+
+    def _fetch(self) -> MetagraphSnapshot:
+        # Blocking chain queries, run in a worker thread
+        block = self._get_block_number()
+        if self._snapshot is not None and block is not None and block == self._snapshot.block:
+            self.skipped_fetches += 1
+            self._snapshot.fetched_at = time.time()
+            return self._snapshot
+
+        modules = cast(dict[str, dict], get_map_modules(self.client, netuid=self.netuid, include_balances=False))
+        addresses = fix_unset_addresses(self.client.query_map_address(self.netuid))
+        self.fetches += 1
+        return MetagraphSnapshot(block=block or 0, modules=modules, addresses=addresses, ip_ports=self._parse_ip_ports(addresses))
+
+    async def refresh(self) -> MetagraphSnapshot:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(asyncio.to_thread(self._fetch))
+
+        snapshot = await asyncio.shield(self._refresh_task)
+        self._snapshot = snapshot
+        return snapshot
+
+    async def get_snapshot(self) -> MetagraphSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot.fetched_at > self.max_age:
+            snapshot = await self.refresh()
+
+        logger.debug(f"Using metagraph snapshot", block=snapshot.block, age=round(time.time() - snapshot.fetched_at, 1), fetches=self.fetches, skipped_fetches=self.skipped_fetches)
+        return snapshot
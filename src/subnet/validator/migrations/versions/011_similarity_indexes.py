@@ -0,0 +1,30 @@
+"""similarity indexes
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 09:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # GiST rather than GIN, so the index serves both the % filter and the <-> KNN ordering
+    op.create_index('ix__miner_receipts__tweet_content_trgm', 'miner_receipts', ['tweet_content'], unique=False, postgresql_using='gist', postgresql_ops={'tweet_content': 'gist_trgm_ops'})
+    op.create_index(op.f('ix__miner_receipts__timestamp'), 'miner_receipts', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix__miner_receipts__timestamp'), table_name='miner_receipts')
+    op.drop_index('ix__miner_receipts__tweet_content_trgm', table_name='miner_receipts', postgresql_using='gist')
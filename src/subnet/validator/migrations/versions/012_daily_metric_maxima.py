@@ -0,0 +1,61 @@
+"""daily metric maxima
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 10:02:17.530126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_metric_maxima',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_followers', sa.BigInteger(), nullable=True),
+    sa.Column('user_following', sa.BigInteger(), nullable=True),
+    sa.Column('user_tweets', sa.BigInteger(), nullable=True),
+    sa.Column('user_likes', sa.BigInteger(), nullable=True),
+    sa.Column('user_listed', sa.BigInteger(), nullable=True),
+    sa.Column('tweet_retweets', sa.BigInteger(), nullable=True),
+    sa.Column('tweet_replies', sa.BigInteger(), nullable=True),
+    sa.Column('tweet_likes', sa.BigInteger(), nullable=True),
+    sa.Column('tweet_quotes', sa.BigInteger(), nullable=True),
+    sa.Column('tweet_bookmarks', sa.BigInteger(), nullable=True),
+    sa.Column('tweet_impressions', sa.BigInteger(), nullable=True),
+    sa.PrimaryKeyConstraint('day', name=op.f('pk__daily_metric_maxima'))
+    )
+
+    # Backfill from the existing rows, so maxima read after the upgrade match the raw tables
+    op.execute("""
+        INSERT INTO daily_metric_maxima (day, tweet_retweets, tweet_replies, tweet_likes, tweet_quotes, tweet_bookmarks, tweet_impressions)
+        SELECT timestamp::date, MAX(tweet_retweet_count), MAX(tweet_reply_count), MAX(tweet_like_count),
+               MAX(tweet_quote_count), MAX(tweet_bookmark_count), MAX(tweet_impression_count)
+        FROM miner_receipts
+        GROUP BY timestamp::date
+    """)
+    op.execute("""
+        INSERT INTO daily_metric_maxima (day, user_followers, user_following, user_tweets, user_likes, user_listed)
+        SELECT timestamp::date, MAX(followers), MAX(following), MAX(tweets), MAX(likes), MAX(listed)
+        FROM miner_discoveries
+        GROUP BY timestamp::date
+        ON CONFLICT (day) DO UPDATE SET
+            user_followers = EXCLUDED.user_followers,
+            user_following = EXCLUDED.user_following,
+            user_tweets = EXCLUDED.user_tweets,
+            user_likes = EXCLUDED.user_likes,
+            user_listed = EXCLUDED.user_listed
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_metric_maxima')
@@ -0,0 +1,33 @@
+"""tweet sentiments
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 11:26:53.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tweet_sentiments',
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('prompt_version', sa.String(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash', 'model', 'prompt_version', name=op.f('pk__tweet_sentiments'))
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tweet_sentiments')
@@ -0,0 +1,34 @@
+"""miner blacklist
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18 13:41:09.207815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('miner_blacklist',
+    sa.Column('miner_key', sa.String(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('miner_key', name=op.f('pk__miner_blacklist'))
+    )
+    op.create_index(op.f('ix__miner_blacklist__expires_at'), 'miner_blacklist', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix__miner_blacklist__expires_at'), table_name='miner_blacklist')
+    op.drop_table('miner_blacklist')
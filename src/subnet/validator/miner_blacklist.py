@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from loguru import logger
+from src.subnet.validator.database.models.miner_blacklist import MinerBlacklistManager
+
+BLACKLIST_REASON_UNVERIFIED_USER = "unverified_user"
+BLACKLIST_REASON_MULTIPLE_ADDRESSES = "multiple_addresses"
+BLACKLIST_REASON_KEY_NOT_IN_DESCRIPTION = "key_not_in_description"
+BLACKLIST_REASON_TWEET_NOT_FOUND = "tweet_not_found"
+
+
+class MinerBlacklist:
+    """
+    Blacklisted miner keys with their reason and expiry.
+
+    Lookups are served from memory. Additions are kept pending and written to the `store` in one batch
+    by `flush`, and `load` restores the entries which did not expire yet, so a restart does not spend
+    Twitter quota on rediscovering miners which were already blacklisted. A `ttl` of None never expires.
+    """
+
+    def __init__(self, store: Optional[MinerBlacklistManager] = None, ttl: Optional[timedelta] = timedelta(days=1)):
+        self.store = store
+        self.ttl = ttl
+        self._entries: dict[str, tuple[str, Optional[datetime]]] = {}
+        self._pending: dict[str, tuple[str, Optional[datetime]]] = {}
+
+    def __contains__(self, miner_key: str) -> bool:
+        entry = self._entries.get(miner_key)
+        if entry is None:
+            return False
+
+        _, expires_at = entry
+        if expires_at is not None and expires_at <= datetime.utcnow():
+            del self._entries[miner_key]
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, miner_key: str, reason: str):
+        expires_at = datetime.utcnow() + self.ttl if self.ttl is not None else None
+        self._entries[miner_key] = (reason, expires_at)
+        self._pending[miner_key] = (reason, expires_at)
+
+    def get_reason(self, miner_key: str) -> Optional[str]:
+        if miner_key not in self:
+            return None
+        return self._entries[miner_key][0]
+
+    async def load(self):
+        if self.store is None:
+            return
+
+        await self.store.remove_expired_entries()
+        for entry in await self.store.get_active_entries():
+            self._entries[entry.miner_key] = (entry.reason, entry.expires_at)
+        logger.info(f"Loaded miner blacklist", blacklisted_miners=len(self._entries))
+
+    async def flush(self):
+        if self.store is None or not self._pending:
+            self._pending.clear()
+            return
+
+        pending, self._pending = self._pending, {}
+        try:
+            await self.store.store_entries([(miner_key, reason, expires_at) for miner_key, (reason, expires_at) in pending.items()])
+        except Exception as e:
+            logger.warning(f"Failed to store miner blacklist", error=e, entries=len(pending))
+            # Keep them for the next flush, unless newer entries replaced them meanwhile
+            for miner_key, entry in pending.items():
+                self._pending.setdefault(miner_key, entry)
+
+    async def remove_expired(self):
+        now = datetime.utcnow()
+        expired = [miner_key for miner_key, (_, expires_at) in self._entries.items() if expires_at is not None and expires_at <= now]
+        for miner_key in expired:
+            del self._entries[miner_key]
+
+        if self.store is not None:
+            await self.store.remove_expired_entries()
+        logger.debug(f"Removed expired miner blacklist entries", expired=len(expired), blacklisted_miners=len(self._entries))
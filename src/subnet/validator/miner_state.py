@@ -0,0 +1,115 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import AbstractSet, Iterable, List, Optional
+from loguru import logger
+from ..protocol import TwitterPost, TwitterPostsPage
+
+
+def fingerprint_posts(twitter_posts: List[TwitterPost]) -> str:
+    """Digest of a twitter_posts answer, order included."""
+    digest = hashlib.blake2b(digest_size=16)
+    for post in twitter_posts:
+        digest.update(post.user_id.encode())
+        digest.update(b"\x00")
+        digest.update(post.tweet_id.encode())
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+@dataclass
+class MinerState:
+    miner_key: str
+    post_ids: frozenset[str]
+    fingerprint: str
+    updated_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class MinerPostsFeed:
+    """Posts served by a paginated miner which were not scored yet, and the cursor to request the next ones."""
+    cursor: Optional[str] = None
+    posts: list[TwitterPost] = field(default_factory=list)
+
+    def prune(self, scored_tweet_ids: AbstractSet[str]):
+        self.posts = [post for post in self.posts if post.tweet_id not in scored_tweet_ids]
+
+    def extend(self, page: TwitterPostsPage):
+        known_tweet_ids = {post.tweet_id for post in self.posts}
+        for post in page.to_twitter_posts():
+            if post.tweet_id not in known_tweet_ids:
+                known_tweet_ids.add(post.tweet_id)
+                self.posts.append(post)
+        if page.cursor is not None:
+            self.cursor = page.cursor
+
+
+class MinerStateCache:
+    """
+    The last answer of each miner which had no new posts to challenge.
+
+    A miner answering exactly the same posts again still has nothing new to challenge, so it gets the outcome
+    of an answer without new posts, 0, without looking up its posts again. Once an answer has new posts its
+    state is dropped, so every post of a backlog gets challenged in turn. States are only kept in memory and
+    for miners still present in the metagraph.
+
+    Paginated miners are only asked for the posts after their feed cursor, at most `max_pending_posts` of them
+    waiting to be scored per miner, so neither side reloads or resends the posts served before. Their pruned
+    feed only holds posts which were not scored yet, so it is always challenged instead of being reused.
+    """
+
+    def __init__(self, max_pending_posts: int = 100):
+        self.max_pending_posts = max_pending_posts
+        self._states: dict[str, MinerState] = {}
+        self._feeds: dict[str, MinerPostsFeed] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._states)
+
+    def get(self, miner_key: str) -> Optional[MinerState]:
+        return self._states.get(miner_key)
+
+    def get_feed(self, miner_key: str) -> MinerPostsFeed:
+        feed = self._feeds.get(miner_key)
+        if feed is None:
+            feed = self._feeds[miner_key] = MinerPostsFeed()
+        return feed
+
+    def discard_feed(self, miner_key: str):
+        self._feeds.pop(miner_key, None)
+
+    def get_unchanged(self, miner_key: str, twitter_posts: List[TwitterPost]) -> Optional[MinerState]:
+        """The state of a miner whose non empty answer is the same as the last one without new posts."""
+        state = self._states.get(miner_key)
+        if state is not None and twitter_posts and state.fingerprint == fingerprint_posts(twitter_posts):
+            self.hits += 1
+            return state
+
+        self.misses += 1
+        return None
+
+    def store(self, miner_key: str, twitter_posts: List[TwitterPost]):
+        """
+        Records an answer which had no new posts. Answers with new posts are not stored, whether they were scored
+        or failed, so the miner's remaining and failed posts are challenged again next step.
+        """
+        self._states[miner_key] = MinerState(
+            miner_key=miner_key,
+            post_ids=frozenset(post.tweet_id for post in twitter_posts),
+            fingerprint=fingerprint_posts(twitter_posts),
+        )
+
+    def discard(self, miner_key: str):
+        self._states.pop(miner_key, None)
+
+    def retain(self, miner_keys: Iterable[str]):
+        miner_keys = set(miner_keys)
+        for miner_key in [miner_key for miner_key in self._states if miner_key not in miner_keys]:
+            del self._states[miner_key]
+        for miner_key in [miner_key for miner_key in self._feeds if miner_key not in miner_keys]:
+            del self._feeds[miner_key]
+
+    def log_stats(self):
+        logger.info(f"Miner state cache stats", miners=len(self._states), hits=self.hits, misses=self.misses, paginated_miners=len(self._feeds))
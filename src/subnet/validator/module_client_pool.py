@@ -0,0 +1,110 @@
+import asyncio
+import json
+from typing import Any, Optional
+import aiohttp
+from communex.errors import NetworkTimeoutError
+from communex.module._protocol import create_method_endpoint, create_request_data
+from communex.module.client import ModuleClient  # type: ignore
+from communex.types import Ss58Address  # type: ignore
+from loguru import logger
+from substrateinterface import Keypair  # type: ignore
+
+
+class PooledModuleClient(ModuleClient):
+    """
+    ModuleClient sending its requests through a shared aiohttp session.
+
+    The upstream client opens a new session, and therefore a new TCP connection, on every call.
+    Requests are still signed per call, since the signature covers the request timestamp.
+    """
+
+    def __init__(self, host: str, port: int, key: Keypair, pool: "ModuleClientPool"):
+        super().__init__(host, port, key)
+        self.pool = pool
+
+    async def call(
+            self,
+            fn: str,
+            target_key: Ss58Address,
+            params: Any = {},
+            timeout: int = 16,
+    ) -> Any:
+        serialized_data, headers = create_request_data(self.key, target_key, params)
+
+        try:
+            async with self.pool.get_session().post(
+                    create_method_endpoint(self.host, self.port, fn),
+                    json=json.loads(serialized_data),
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                if response.status != 200:
+                    response_j = await response.json()
+                    raise Exception(f"Unexpected status code: {response.status}, response: {response_j}")
+
+                if response.content_type != "application/json":
+                    raise Exception(f"Unknown content type: {response.content_type}")
+
+                return await asyncio.wait_for(response.json(), timeout=timeout)
+        except asyncio.TimeoutError as e:
+            raise NetworkTimeoutError(
+                f"The call took longer than the timeout of {timeout} second(s)"
+            ).with_traceback(e.__traceback__)
+
+
+class ModuleClientPool:
+    """
+    Keeps one client per (ip, port, miner key) across validation steps, all sharing one keep-alive connection pool.
+    """
+
+    def __init__(self, key: Keypair, max_connections: int = 100, keepalive_timeout: int = 600):
+        self.key = key
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self._clients: dict[tuple[str, int, str], PooledModuleClient] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def get(self, ip: str, port: int, miner_key: str) -> PooledModuleClient:
+        pool_key = (ip, int(port), miner_key)
+        client = self._clients.get(pool_key)
+        if client is not None:
+            self.hits += 1
+            return client
+
+        self.misses += 1
+        client = PooledModuleClient(ip, int(port), self.key, self)
+        self._clients[pool_key] = client
+        return client
+
+    def sync_addresses(self, addresses: dict[str, tuple[str, int]]):
+        """
+        Evicts clients of miners which left the subnet or whose address changed.
+        `addresses` maps miner key to its current (ip, port).
+        """
+        for pool_key in list(self._clients.keys()):
+            ip, port, miner_key = pool_key
+            address = addresses.get(miner_key)
+            if address is None or (address[0], int(address[1])) != (ip, port):
+                del self._clients[pool_key]
+                self.evictions += 1
+
+    def log_stats(self):
+        logger.info(f"Module client pool", clients=len(self._clients), hits=self.hits, misses=self.misses, evictions=self.evictions)
+
+    async def close(self):
+        self._clients.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
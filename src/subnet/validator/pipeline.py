@@ -0,0 +1,146 @@
+import asyncio
+import time
+import traceback
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Optional, Union
+from loguru import logger
+
+BATCH_POLL_INTERVAL = 0.05
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    `handler` receives a single item and returns the item to pass on, or None to drop it.
+    When `batch_size` is set, `handler` receives a list of up to `batch_size` items instead, collected for at most
+    `batch_wait` seconds after the first one arrives, and returns the list of items to pass on.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            handler: Callable[[Any], Awaitable[Any]],
+            concurrency: int = 1,
+            queue_size: int = 64,
+            batch_size: Optional[int] = None,
+            batch_wait: float = 1.0,
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.processed = 0
+        self.dropped = 0
+        self.busy_time = 0.0
+
+
+class Pipeline:
+    """
+    Streams items through stages connected by bounded queues.
+
+    Every stage runs its own pool of workers, so items move on as soon as a stage is done with them,
+    and a slow stage fills its input queue and makes the stages before it wait instead of buffering the whole step.
+    """
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = stages
+
+    async def run(self, items: Union[Iterable, AsyncIterable]) -> list:
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        # Set once no more items can arrive on the matching queue, so batch stages stop waiting to fill a batch
+        inputs_closed = [asyncio.Event() for _ in self.stages]
+        results = []
+        workers = []
+
+        for index, stage in enumerate(self.stages):
+            input_queue = queues[index]
+            output_queue = queues[index + 1] if index + 1 < len(queues) else None
+            worker = self._batch_worker if stage.batch_size else self._worker
+            for _ in range(stage.concurrency):
+                workers.append(asyncio.create_task(worker(stage, input_queue, output_queue, inputs_closed[index], results)))
+
+        try:
+            if isinstance(items, AsyncIterable):
+                async for item in items:
+                    await queues[0].put(item)
+            else:
+                for item in items:
+                    await queues[0].put(item)
+
+            # Items only move forward, so once a queue is drained everything it held is in the next one
+            inputs_closed[0].set()
+            for index, queue in enumerate(queues):
+                await queue.join()
+                if index + 1 < len(inputs_closed):
+                    inputs_closed[index + 1].set()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        for stage in self.stages:
+            logger.info(f"Pipeline stage finished", stage=stage.name, processed=stage.processed, dropped=stage.dropped, busy_time=round(stage.busy_time, 3))
+
+        return results
+
+    @staticmethod
+    async def _forward(outputs: list, output_queue: Optional[asyncio.Queue], results: list):
+        for output in outputs:
+            if output_queue is None:
+                results.append(output)
+            else:
+                await output_queue.put(output)
+
+    async def _worker(self, stage: Stage, input_queue: asyncio.Queue, output_queue: Optional[asyncio.Queue], input_closed: asyncio.Event, results: list):
+        while True:
+            item = await input_queue.get()
+            try:
+                start_time = time.time()
+                try:
+                    output = await stage.handler(item)
+                except Exception as e:
+                    logger.error(f"Pipeline stage failed", stage=stage.name, error=e, traceback=traceback.format_exc())
+                    output = None
+                stage.busy_time += time.time() - start_time
+
+                stage.processed += 1
+                if output is None:
+                    stage.dropped += 1
+                else:
+                    await self._forward([output], output_queue, results)
+            finally:
+                input_queue.task_done()
+
+    async def _batch_worker(self, stage: Stage, input_queue: asyncio.Queue, output_queue: Optional[asyncio.Queue], input_closed: asyncio.Event, results: list):
+        while True:
+            batch = [await input_queue.get()]
+            try:
+                # Poll instead of wait_for(get()), which can lose an item when the timeout races the get
+                deadline = time.time() + stage.batch_wait
+                while len(batch) < stage.batch_size:
+                    try:
+                        batch.append(input_queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    remaining = deadline - time.time()
+                    if remaining <= 0 or input_closed.is_set():
+                        break
+                    await asyncio.sleep(min(remaining, BATCH_POLL_INTERVAL))
+
+                start_time = time.time()
+                try:
+                    outputs = await stage.handler(batch) or []
+                except Exception as e:
+                    logger.error(f"Pipeline stage failed", stage=stage.name, error=e, batch_size=len(batch), traceback=traceback.format_exc())
+                    outputs = []
+                stage.busy_time += time.time() - start_time
+
+                stage.processed += len(batch)
+                stage.dropped += len(batch) - len(outputs)
+                await self._forward(outputs, output_queue, results)
+            finally:
+                for _ in batch:
+                    input_queue.task_done()
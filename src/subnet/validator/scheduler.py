@@ -0,0 +1,240 @@
+import asyncio
+import math
+import signal
+import time
+import traceback
+from typing import Awaitable, Callable, Optional
+from loguru import logger
+
+SCHEDULE_ALIGN_WALL_CLOCK = "wall_clock"
+SCHEDULE_ALIGN_BLOCK = "block"
+
+SCHEDULE_OVERRUN_SKIP = "skip"
+SCHEDULE_OVERRUN_QUEUE = "queue"
+
+
+class StepScheduler:
+    """
+    Runs a step coroutine on a fixed grid of ticks without blocking the event loop in between.
+
+    Ticks are multiples of `interval` seconds since the epoch, or of `interval / block_time` blocks when aligned
+    to the chain, so step duration never shifts later ticks. When a step overruns one or more ticks, `skip`
+    waits for the next tick ahead while `queue` starts one catch-up step right away.
+
+    Maintenance coroutines run after every step, concurrently with the wait for the next tick, at most one
+    instance of each at a time. Those added with `before_tick` are delayed to start that many seconds before
+    the next tick, e.g. to prepare fresh state for the next step. `stop` lets the running step finish within
+    `shutdown_grace` seconds before cancelling it.
+    """
+
+    def __init__(
+            self,
+            interval: float,
+            align: str = SCHEDULE_ALIGN_WALL_CLOCK,
+            overrun: str = SCHEDULE_OVERRUN_SKIP,
+            block_time: float = 8.0,
+            get_block_number: Optional[Callable[[], Awaitable[Optional[int]]]] = None,
+            shutdown_grace: float = 30.0,
+    ):
+        if align not in (SCHEDULE_ALIGN_WALL_CLOCK, SCHEDULE_ALIGN_BLOCK):
+            raise ValueError(f"Unsupported schedule alignment: {align}")
+        if overrun not in (SCHEDULE_OVERRUN_SKIP, SCHEDULE_OVERRUN_QUEUE):
+            raise ValueError(f"Unsupported schedule overrun policy: {overrun}")
+        if align == SCHEDULE_ALIGN_BLOCK and get_block_number is None:
+            raise ValueError("Block aligned schedules need get_block_number")
+
+        self.interval = interval
+        self.align = align
+        self.overrun = overrun
+        self.block_time = block_time
+        self.get_block_number = get_block_number
+        self.shutdown_grace = shutdown_grace
+        self.interval_blocks = max(1, round(interval / block_time))
+
+        self._maintenance: dict[str, tuple[Callable[[], Awaitable[None]], Optional[float]]] = {}
+        self._maintenance_tasks: dict[str, asyncio.Task] = {}
+        self._stop_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.steps = 0
+        self.skipped_ticks = 0
+
+    def add_maintenance(self, name: str, coroutine_function: Callable[[], Awaitable[None]], before_tick: Optional[float] = None):
+        self._maintenance[name] = (coroutine_function, before_tick)
+
+    def _bind_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._stop_event = asyncio.Event()
+
+    def stop(self):
+        """Requests a graceful stop, callable from any thread."""
+        if self._loop is None or self._stop_event is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop_event is not None and self._stop_event.is_set()
+
+    def install_signal_handlers(self, on_signal: Optional[Callable[[], None]] = None, signals=(signal.SIGINT, signal.SIGTERM)):
+        self._bind_loop()
+
+        def handle(signal_num):
+            logger.info(f"Received shutdown signal, stopping...", signal=signal.Signals(signal_num).name)
+            self.stop()
+            if on_signal is not None:
+                on_signal()
+
+        for signal_num in signals:
+            self._loop.add_signal_handler(signal_num, handle, signal_num)
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleeps unless stopped first, returns whether the scheduler is still running."""
+        if seconds > 0:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+            except asyncio.TimeoutError:
+                pass
+        return not self._stop_event.is_set()
+
+    def _next_wall_clock_tick(self, after: float) -> float:
+        return (math.floor(after / self.interval) + 1) * self.interval
+
+    async def _wait_for_wall_clock_tick(self, tick: float) -> bool:
+        return await self._sleep(tick - time.time())
+
+    async def _wait_for_block(self, target_block: int) -> bool:
+        while not self._stop_event.is_set():
+            block = await self.get_block_number()
+            if block is not None and block >= target_block:
+                return True
+            remaining_blocks = target_block - block if block is not None else 1
+            # Sleep most of the expected time at once, then poll every half block
+            if not await self._sleep(max(remaining_blocks - 1, 0) * self.block_time + self.block_time / 2):
+                return False
+        return False
+
+    def _start_maintenance(self, until_next_tick: float):
+        for name, (coroutine_function, before_tick) in self._maintenance.items():
+            task = self._maintenance_tasks.get(name)
+            if task is not None and not task.done():
+                continue
+
+            delay = max(until_next_tick - before_tick, 0) if before_tick is not None else 0
+
+            async def run(name=name, coroutine_function=coroutine_function, delay=delay):
+                try:
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await coroutine_function()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Maintenance task failed", task=name, error=e, traceback=traceback.format_exc())
+
+            self._maintenance_tasks[name] = asyncio.create_task(run())
+
+    async def _stop_maintenance(self):
+        tasks = [task for task in self._maintenance_tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_step(self, step: Callable[[], Awaitable[None]]):
+        step_task = asyncio.create_task(step())
+        stop_task = asyncio.create_task(self._stop_event.wait())
+        try:
+            await asyncio.wait({step_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not step_task.done():
+                logger.info(f"Waiting for the running step to finish", shutdown_grace=self.shutdown_grace)
+                done, _ = await asyncio.wait({step_task}, timeout=self.shutdown_grace)
+                if not done:
+                    logger.warning(f"Step did not finish in time, cancelling it")
+                    step_task.cancel()
+                    await asyncio.gather(step_task, return_exceptions=True)
+                    return
+
+            try:
+                step_task.result()
+            except Exception as e:
+                logger.error(f"Validation step failed", error=e, traceback=traceback.format_exc())
+        finally:
+            stop_task.cancel()
+
+    async def run(self, step: Callable[[], Awaitable[None]]):
+        self._bind_loop()
+
+        try:
+            if self.align == SCHEDULE_ALIGN_WALL_CLOCK:
+                await self._run_wall_clock(step)
+            else:
+                await self._run_block_aligned(step)
+        finally:
+            await self._stop_maintenance()
+            logger.info("Terminating validation loop", steps=self.steps, skipped_ticks=self.skipped_ticks)
+
+    async def _run_wall_clock(self, step: Callable[[], Awaitable[None]]):
+        # The first step starts right away, off the grid
+        tick: Optional[float] = None
+        while not self._stop_event.is_set():
+            start_time = time.time()
+            await self._run_step(step)
+            self.steps += 1
+            if self._stop_event.is_set():
+                return
+
+            now = time.time()
+            next_tick = self._next_wall_clock_tick(tick if tick is not None else now)
+            if next_tick <= now:
+                missed = math.floor((now - next_tick) / self.interval) + 1
+                logger.warning(f"Validation step overran its interval", elapsed=round(now - start_time, 3), missed_ticks=missed, overrun=self.overrun)
+                if self.overrun == SCHEDULE_OVERRUN_QUEUE:
+                    self._start_maintenance(0)
+                    tick = now
+                    continue
+                self.skipped_ticks += missed
+                next_tick = self._next_wall_clock_tick(now)
+
+            self._start_maintenance(next_tick - now)
+            logger.info(f"Sleeping for {round(next_tick - now, 3)}")
+            if not await self._wait_for_wall_clock_tick(next_tick):
+                return
+            tick = next_tick
+
+    async def _run_block_aligned(self, step: Callable[[], Awaitable[None]]):
+        block: Optional[int] = None
+        while not self._stop_event.is_set():
+            await self._run_step(step)
+            self.steps += 1
+            if self._stop_event.is_set():
+                return
+
+            current_block = await self.get_block_number()
+            if block is None and current_block is None:
+                # Could not place the first step on the grid, retry on the next block
+                next_block = None
+            else:
+                next_block = ((block if block is not None else current_block) // self.interval_blocks + 1) * self.interval_blocks
+            if next_block is None:
+                self._start_maintenance(self.block_time)
+                if not await self._sleep(self.block_time):
+                    return
+                continue
+            if current_block is None:
+                current_block = next_block
+            if current_block > next_block:
+                missed = (current_block - next_block) // self.interval_blocks + 1
+                logger.warning(f"Validation step overran its interval", block=current_block, missed_ticks=missed, overrun=self.overrun)
+                if self.overrun == SCHEDULE_OVERRUN_QUEUE:
+                    self._start_maintenance(0)
+                    block = current_block
+                    continue
+                self.skipped_ticks += missed
+                next_block = (current_block // self.interval_blocks + 1) * self.interval_blocks
+
+            self._start_maintenance((next_block - current_block) * self.block_time)
+            logger.info(f"Waiting for block {next_block}", block=current_block)
+            if not await self._wait_for_block(next_block):
+                return
+            block = next_block
@@ -1,5 +1,8 @@
+import time
 from datetime import datetime, timedelta
-
+from typing import Optional
+import numpy as np
+from pydantic import BaseModel
 from src.subnet.protocol import TwitterPostMetadata
 from src.subnet.validator.database.models.miner_discovery import MinerDiscoveryManager
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
@@ -24,6 +27,28 @@ tweet_weights = {
 similarity_weight = 0.2
 positivity_weight = 0.1
 
+CREATED_AT_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+DECAY_START = timedelta(hours=36)
+DECAY_END = timedelta(days=7)
+
+# TwitterPostMetadata fields score_batch reads, mapped to their column dtype
+SCORE_COLUMNS = {
+    "user_followers": np.float64,
+    "user_following": np.float64,
+    "user_tweets": np.float64,
+    "user_likes": np.float64,
+    "user_listed": np.float64,
+    "tweet_retweets": np.float64,
+    "tweet_replies": np.float64,
+    "tweet_likes": np.float64,
+    "tweet_quotes": np.float64,
+    "tweet_bookmarks": np.float64,
+    "tweet_impressions": np.float64,
+    "similarity": np.float64,
+    "positivity": np.float64,
+    "created_at": str,
+}
+
 
 def normalize(value, max_value):
     """Normalize values to a 0-1 range."""
@@ -32,15 +57,59 @@ def normalize(value, max_value):
     return value / max_value
 
 
+def normalize_array(values: np.ndarray, max_value) -> np.ndarray:
+    """Vectorized `normalize`, zero wherever the max is zero."""
+    if max_value == 0:
+        return np.zeros(len(values))
+    return values / max_value
+
+
+def parse_created_at(created_at: np.ndarray) -> np.ndarray:
+    """Parses `CREATED_AT_FORMAT` timestamps, e.g. 2024-06-01T12:00:00.000Z, into naive UTC datetime64[us]."""
+    return np.char.rstrip(created_at.astype(str), 'Z').astype('datetime64[us]')
+
+
+def metadata_to_columns(metadata_list: list[TwitterPostMetadata]) -> dict[str, np.ndarray]:
+    """Lays a list of metadata out as the columns `ScoreCalculator.score_batch` expects."""
+    return {
+        column: np.array([getattr(metadata, column) for metadata in metadata_list], dtype=dtype)
+        for column, dtype in SCORE_COLUMNS.items()
+    }
+
+
+class NormalizationSnapshot(BaseModel):
+    """Last month maxima used to normalize user and tweet metrics, frozen for the duration of a step."""
+    user_max_metrics: dict[str, float]
+    tweet_max_metrics: dict[str, float]
+    taken_at: float
+
+
 class ScoreCalculator:
 
-    def __init__(self, miner_discovery_manager: MinerDiscoveryManager, miner_receipt_manager: MinerReceiptManager):
+    def __init__(self, miner_discovery_manager: MinerDiscoveryManager, miner_receipt_manager: MinerReceiptManager, snapshot_max_age: int = 0):
         self.miner_discovery_manager = miner_discovery_manager
         self.miner_receipt_manager = miner_receipt_manager
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot: Optional[NormalizationSnapshot] = None
+
+    async def load_normalization_snapshot(self) -> NormalizationSnapshot:
+        return NormalizationSnapshot(
+            user_max_metrics=await self.miner_discovery_manager.get_max_metrics_last_month(),
+            tweet_max_metrics=await self.miner_receipt_manager.get_max_metrics_last_month_receipt(),
+            taken_at=time.time(),
+        )
 
-    async def calculate_user_power_score(self, user_followers, user_following, user_tweets, user_likes, user_listed):
-        max_metrics = await self.miner_discovery_manager.get_max_metrics_last_month()
+    async def get_normalization_snapshot(self) -> NormalizationSnapshot:
+        """
+        Returns the normalization snapshot for a new step.
+        It is reloaded once it is older than `snapshot_max_age` seconds; with the default of 0, on every step.
+        """
+        if self._snapshot is None or time.time() - self._snapshot.taken_at >= self.snapshot_max_age:
+            self._snapshot = await self.load_normalization_snapshot()
+        return self._snapshot
 
+    @staticmethod
+    def calculate_user_power_score(user_followers, user_following, user_tweets, user_likes, user_listed, max_metrics):
         followers_score = normalize(user_followers, max_metrics['followers']) * user_weights['followers']
         following_score = normalize(user_following, max_metrics['following']) * user_weights['following']
         tweets_score = normalize(user_tweets, max_metrics['tweets']) * user_weights['tweets']
@@ -50,10 +119,8 @@ class ScoreCalculator:
         user_power_score = followers_score + following_score + tweets_score + likes_score + listed_score
         return user_power_score
 
-    async def calculate_tweet_success_score(self, tweet_retweets, tweet_replies, tweet_likes, tweet_quotes, tweet_bookmarks, tweet_impressions):
-
-        max_metrics = await self.miner_receipt_manager.get_max_metrics_last_month_receipt()
-
+    @staticmethod
+    def calculate_tweet_success_score(tweet_retweets, tweet_replies, tweet_likes, tweet_quotes, tweet_bookmarks, tweet_impressions, max_metrics):
         retweets_score = normalize(tweet_retweets, max_metrics['retweets']) * tweet_weights['retweets']
         replies_score = normalize(tweet_replies, max_metrics['replies']) * tweet_weights['replies']
         likes_score = normalize(tweet_likes, max_metrics['likes']) * tweet_weights['likes']
@@ -69,12 +136,12 @@ class ScoreCalculator:
         return similarity * similarity_weight
 
     @staticmethod
-    def calculate_time_decay_multiplier(created_at):
-        created_at = datetime.strptime(created_at, '%Y-%m-%dT%H:%M:%S.%fZ')
-        now = datetime.utcnow()
+    def calculate_time_decay_multiplier(created_at, now: Optional[datetime] = None):
+        created_at = datetime.strptime(created_at, CREATED_AT_FORMAT)
+        now = now or datetime.utcnow()
         tweet_age = now - created_at
-        hours_36 = timedelta(hours=36)
-        days_7 = timedelta(days=7)
+        hours_36 = DECAY_START
+        days_7 = DECAY_END
 
         if tweet_age <= hours_36:
             return 1.0
@@ -85,22 +152,27 @@ class ScoreCalculator:
             decay_time = tweet_age - hours_36
             return max(0.0, 1.0 - (decay_time.total_seconds() / total_decay_range.total_seconds()))
 
-    async def calculate_overall_score(self, metadata: TwitterPostMetadata):
-        user_power_score = await self.calculate_user_power_score(
+    async def calculate_overall_score(self, metadata: TwitterPostMetadata, snapshot: Optional[NormalizationSnapshot] = None, now: Optional[datetime] = None):
+        if snapshot is None:
+            snapshot = await self.load_normalization_snapshot()
+
+        user_power_score = self.calculate_user_power_score(
             metadata.user_followers,
             metadata.user_following,
             metadata.user_tweets,
             metadata.user_likes,
-            metadata.user_listed
+            metadata.user_listed,
+            snapshot.user_max_metrics
         )
 
-        tweet_success_score = await self.calculate_tweet_success_score(
+        tweet_success_score = self.calculate_tweet_success_score(
             metadata.tweet_retweets,
             metadata.tweet_replies,
             metadata.tweet_likes,
             metadata.tweet_quotes,
             metadata.tweet_bookmarks,
-            metadata.tweet_impressions
+            metadata.tweet_impressions,
+            snapshot.tweet_max_metrics
         )
 
         similarity_score = self.calculate_similarity_score(
@@ -109,7 +181,53 @@ class ScoreCalculator:
 
         positivity_score = metadata.positivity / 100
 
-        time_decay_multiplier = self.calculate_time_decay_multiplier(metadata.created_at)
+        time_decay_multiplier = self.calculate_time_decay_multiplier(metadata.created_at, now)
         total_score = (tweet_success_score * 0.8) + (user_power_score * 0.2)
         scaled_score = total_score * 100 * time_decay_multiplier * similarity_score * positivity_score
         return min(max(scaled_score, 0), 100)  # Clamping between 0 and 100
+
+    @staticmethod
+    def calculate_time_decay_multipliers(created_at: np.ndarray, now: Optional[datetime] = None) -> np.ndarray:
+        now = np.datetime64(now or datetime.utcnow(), 'us')
+        tweet_age = now - parse_created_at(created_at)
+        decay_start = np.timedelta64(DECAY_START, 'us')
+        decay_end = np.timedelta64(DECAY_END, 'us')
+        # Subtract in integer microseconds before converting to seconds, as timedelta arithmetic does
+        decay_time = (tweet_age - decay_start) / np.timedelta64(1, 's')
+        multipliers = np.maximum(1.0 - decay_time / (DECAY_END - DECAY_START).total_seconds(), 0.0)
+        multipliers = np.where(tweet_age <= decay_start, 1.0, multipliers)
+        return np.where(tweet_age >= decay_end, 0.0, multipliers)
+
+    def score_batch(self, columns: dict[str, np.ndarray], snapshot: NormalizationSnapshot, now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Vectorized `calculate_overall_score` over columns laid out as by `metadata_to_columns`.
+
+        Terms are combined in the same order as the scalar path, so scores are identical to it. `now`
+        pins the time decay reference, e.g. to the original scoring time when replaying stored receipts.
+        """
+        user_max_metrics = snapshot.user_max_metrics
+        user_power_scores = (
+            normalize_array(columns["user_followers"], user_max_metrics['followers']) * user_weights['followers']
+            + normalize_array(columns["user_following"], user_max_metrics['following']) * user_weights['following']
+            + normalize_array(columns["user_tweets"], user_max_metrics['tweets']) * user_weights['tweets']
+            + normalize_array(columns["user_likes"], user_max_metrics['likes']) * user_weights['likes']
+            + normalize_array(columns["user_listed"], user_max_metrics['listed']) * user_weights['listed']
+        )
+
+        tweet_max_metrics = snapshot.tweet_max_metrics
+        tweet_success_scores = (
+            normalize_array(columns["tweet_retweets"], tweet_max_metrics['retweets']) * tweet_weights['retweets']
+            + normalize_array(columns["tweet_replies"], tweet_max_metrics['replies']) * tweet_weights['replies']
+            + normalize_array(columns["tweet_likes"], tweet_max_metrics['likes']) * tweet_weights['likes']
+            + normalize_array(columns["tweet_quotes"], tweet_max_metrics['quotes']) * tweet_weights['quotes']
+            + normalize_array(columns["tweet_bookmarks"], tweet_max_metrics['bookmarks']) * tweet_weights['bookmarks']
+            + normalize_array(columns["tweet_impressions"], tweet_max_metrics['impressions']) * tweet_weights['impressions']
+        )
+
+        similarity_scores = (1 - columns["similarity"]) * similarity_weight
+        positivity_scores = columns["positivity"] / 100
+
+        time_decay_multipliers = self.calculate_time_decay_multipliers(columns["created_at"], now)
+        total_scores = (tweet_success_scores * 0.8) + (user_power_scores * 0.2)
+        scaled_scores = total_scores * 100 * time_decay_multipliers * similarity_scores * positivity_scores
+        return np.clip(scaled_scores, 0, 100)
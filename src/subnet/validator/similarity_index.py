@@ -0,0 +1,143 @@
+import heapq
+import zlib
+from datetime import datetime
+from typing import Optional
+import numpy as np
+
+# Mersenne prime 2^31 - 1; with a < 2^31 and 32 bit hashes, a * x + b never overflows uint64
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+def extract_trigrams(text: str) -> frozenset[str]:
+    """
+    Trigrams the way pg_trgm builds them: lower cased alphanumeric words, each padded with
+    two spaces in front and one behind, so Jaccard similarity of two sets matches `similarity()`.
+    """
+    trigrams = set()
+    word = []
+    for char in text.lower() + " ":
+        if char.isalnum():
+            word.append(char)
+            continue
+        if word:
+            padded = "  " + "".join(word) + " "
+            for i in range(len(padded) - 2):
+                trigrams.add(padded[i:i + 3])
+            word = []
+    return frozenset(trigrams)
+
+
+def similarity_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Oldest receipt time compared against, the start of last month, as
+    `DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '1 month'` in the database similarity query.
+    """
+    now = now or datetime.utcnow()
+    if now.month == 1:
+        return datetime(now.year - 1, 12, 1)
+    return datetime(now.year, now.month - 1, 1)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TweetSimilarityIndex:
+    """
+    In-memory near-duplicate index over recent receipt contents.
+
+    MinHash signatures split into LSH bands select candidate tweets sharing at least one band,
+    and the exact trigram Jaccard similarity of those candidates is returned, so results are on the
+    same 0-1 scale as pg_trgm's `similarity()`. Entries from before the start of last month, the window of
+    the database query, are expired as new ones arrive, whatever order they were added in.
+    """
+
+    def __init__(self, num_bands: int = 32, rows_per_band: int = 2, threshold: float = 0.3, seed: int = 1):
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.threshold = threshold
+
+        num_permutations = num_bands * rows_per_band
+        random_state = np.random.RandomState(seed)
+        self._a = random_state.randint(1, int(MERSENNE_PRIME), size=num_permutations).astype(np.uint64)
+        self._b = random_state.randint(0, int(MERSENNE_PRIME), size=num_permutations).astype(np.uint64)
+
+        # tweet_id -> (trigrams, timestamp, band keys)
+        self._entries: dict[str, tuple[frozenset, datetime, list[bytes]]] = {}
+        # (timestamp, tweet_id) min-heap for expiry, entries replaced or removed since are skipped lazily
+        self._expiry_heap: list[tuple[datetime, str]] = []
+        self._bands: list[dict[bytes, set[str]]] = [{} for _ in range(num_bands)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _signature(self, trigrams: frozenset) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(trigram.encode("utf-8")) for trigram in trigrams), dtype=np.uint64, count=len(trigrams))
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, trigrams: frozenset) -> list[bytes]:
+        signature = self._signature(trigrams)
+        return [
+            signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+            for band in range(self.num_bands)
+        ]
+
+    def add(self, tweet_id: str, tweet_content: str, timestamp: Optional[datetime] = None):
+        timestamp = timestamp or datetime.utcnow()
+        if tweet_id in self._entries:
+            self._remove(tweet_id)
+
+        trigrams = extract_trigrams(tweet_content)
+        if not trigrams:
+            return
+
+        band_keys = self._band_keys(trigrams)
+        self._entries[tweet_id] = (trigrams, timestamp, band_keys)
+        heapq.heappush(self._expiry_heap, (timestamp, tweet_id))
+        for band, band_key in enumerate(band_keys):
+            self._bands[band].setdefault(band_key, set()).add(tweet_id)
+
+        self.expire()
+
+    def _remove(self, tweet_id: str):
+        _, _, band_keys = self._entries.pop(tweet_id)
+        for band, band_key in enumerate(band_keys):
+            bucket = self._bands[band].get(band_key)
+            if bucket is None:
+                continue
+            bucket.discard(tweet_id)
+            if not bucket:
+                del self._bands[band][band_key]
+
+    def expire(self, now: Optional[datetime] = None):
+        cutoff = similarity_cutoff(now)
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+            timestamp, tweet_id = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(tweet_id)
+            if entry is not None and entry[1] == timestamp:
+                self._remove(tweet_id)
+
+    def query(self, tweet_content: str) -> float:
+        """
+        Highest similarity to an indexed tweet, or 0 when no candidate reaches `threshold`.
+        """
+        trigrams = extract_trigrams(tweet_content)
+        if not trigrams or not self._entries:
+            return 0
+
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(trigrams)):
+            candidates.update(self._bands[band].get(band_key, ()))
+
+        cutoff = similarity_cutoff()
+        best = 0
+        for tweet_id in candidates:
+            candidate_trigrams, timestamp, _ = self._entries[tweet_id]
+            if timestamp < cutoff:
+                continue
+            best = max(best, jaccard(trigrams, candidate_trigrams))
+
+        return best if best >= self.threshold else 0
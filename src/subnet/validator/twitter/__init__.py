@@ -1,379 +1,247 @@
-from itertools import cycle
-import requests
+import asyncio
+from typing import Optional
+import aiohttp
 from loguru import logger
 from pydantic import BaseModel
-from ratelimit import limits, sleep_and_retry
-from src.subnet.validator._config import ValidatorSettings
+from src.subnet.validator.twitter.token_scheduler import BearerTokenScheduler
+from src.subnet.validator.twitter.user_cache import TwitterUserCache
 
+USER_FIELDS = "created_at,description,entities,id,location,name,pinned_tweet_id,profile_image_url,protected,public_metrics,url,username,verified,verified_type,withheld"
+TWEET_FIELDS = "article,attachments,author_id,card_uri,context_annotations,conversation_id,created_at,edit_controls,edit_history_tweet_ids,entities,geo,id,in_reply_to_user_id,lang,note_tweet,possibly_sensitive,public_metrics,referenced_tweets,reply_settings,scopes,source,text,withheld"
+TWEET_EXPANSIONS = "author_id,referenced_tweets.id,referenced_tweets.id.author_id,entities.mentions.username,entities.note.mentions.username,attachments.poll_ids,attachments.media_keys,attachments.media_source_tweet,in_reply_to_user_id,geo.place_id,edit_history_tweet_ids,article.cover_media,article.media_entities"
+TWEET_USER_FIELDS = "name,username,profile_image_url"
 
-class RoundRobinBearerTokenProvider:
-    def __init__(self, settings: ValidatorSettings):
-        self.tokens = settings.TWITTER_BEARER_TOKENS.split(";")
-        self.tokens_cycle = cycle(self.tokens)
-
-    def get_token(self):
-        return next(self.tokens_cycle)
+# Maximum number of ids accepted by the multi-id users and tweets lookup endpoints
+MAX_IDS_PER_LOOKUP = 100
 
 
 class TwitterClient:
-    def __init__(self, token_provider: RoundRobinBearerTokenProvider):
-        self.token_provider = token_provider
-        self.token_list = token_provider.tokens
+    def __init__(self, token_scheduler: BearerTokenScheduler, max_concurrency: int = 8, request_timeout: int = 10, keepalive_timeout: int = 60):
+        self.token_scheduler = token_scheduler
+        self.token_list = token_scheduler.tokens
         self.token_count = len(self.token_list)
-
-    def create_headers(self):
-        bearer_token = self.token_provider.get_token()
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session is created lazily, so it gets bound to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def create_headers(bearer_token: str):
         headers = {"Authorization": f"Bearer {bearer_token}"}
         return headers
 
-    @sleep_and_retry
-    @limits(calls=15, period=15 * 60)
-    def get_user(self, user_id):
-        url = f"https://api.twitter.com/2/users/{user_id}"
+    async def _get(self, method_name: str, endpoint: str, url: str, params: dict):
+        # A 429 only exhausts one token, so retry once per token before giving up
+        for _ in range(max(self.token_count, 1)):
+            bearer_token = await self.token_scheduler.acquire(endpoint)
+            async with self._semaphore:
+                try:
+                    response = await self._get_session().get(url, headers=self.create_headers(bearer_token), params=params)
+                except Exception:
+                    # The request never got an answer, its quota was not used
+                    self.token_scheduler.release(bearer_token, endpoint)
+                    raise
+
+                async with response:
+                    self.token_scheduler.update(bearer_token, endpoint, response.headers, response.status)
+                    if response.status == 429:
+                        logger.warning(f"{method_name}: Rate limited, retrying with another token", endpoint=endpoint)
+                        continue
+
+                    if response.status != 200:
+                        self.token_scheduler.release(bearer_token, endpoint)
+                        text = await response.text()
+                        logger.error(f"{method_name}: Request returned an error: {response.status} {text}")
+                        raise Exception(f"Request returned an error: {response.status} {text}")
+
+                    return await response.json()
+
+        raise Exception(f"Request returned an error: 429 rate limit exceeded for all tokens on {endpoint}")
+
+    async def get_users(self, user_ids: list[str]):
+        url = "https://api.twitter.com/2/users"
 
-        # Define the parameters
         params = {
-            "user.fields": "created_at,description,entities,id,location,name,pinned_tweet_id,profile_image_url,protected,public_metrics,url,username,verified,verified_type,withheld"
+            "ids": ",".join(user_ids),
+            "user.fields": USER_FIELDS
         }
 
-        headers = self.create_headers()
-        response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code != 200:
-            logger.error(f"get_user: Request returned an error: {response.status_code} {response.text}")
-            raise Exception(f"Request returned an error: {response.status_code} {response.text}")
+        return await self._get("get_users", "users", url, params)
 
-        return response.json()
-
-    @sleep_and_retry
-    @limits(calls=15, period=15 * 60)
-    def get_tweet_details(self, tweet_id):
-        url = f"https://api.twitter.com/2/tweets/{tweet_id}"
+    async def get_tweets(self, tweet_ids: list[str]):
+        url = "https://api.twitter.com/2/tweets"
 
         params = {
-            "tweet.fields": "article,attachments,author_id,card_uri,context_annotations,conversation_id,created_at,edit_controls,edit_history_tweet_ids,entities,geo,id,in_reply_to_user_id,lang,note_tweet,possibly_sensitive,public_metrics,referenced_tweets,reply_settings,scopes,source,text,withheld",
-            "expansions": "author_id,referenced_tweets.id,referenced_tweets.id.author_id,entities.mentions.username,entities.note.mentions.username,attachments.poll_ids,attachments.media_keys,attachments.media_source_tweet,in_reply_to_user_id,geo.place_id,edit_history_tweet_ids,article.cover_media,article.media_entities",
-            "user.fields": "name,username,profile_image_url"
+            "ids": ",".join(tweet_ids),
+            "tweet.fields": TWEET_FIELDS,
+            "expansions": TWEET_EXPANSIONS,
+            "user.fields": TWEET_USER_FIELDS
         }
 
-        headers = self.create_headers()
-        response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code != 200:
-            logger.error(f"get_tweet_details: Request returned an error: {response.status_code} {response.text}")
-            raise Exception(f"Request returned an error: {response.status_code} {response.text}")
-
-        return response.json()
+        return await self._get("get_tweets", "tweets", url, params)
 
 
 class TwitterService:
-    def __init__(self, twitter_client):
+    def __init__(self, twitter_client: TwitterClient, user_cache: Optional[TwitterUserCache] = None):
         self.twitter_client = twitter_client
+        self.user_cache = user_cache
+        self._refreshing_user_ids: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task] = set()
 
-    def get_user(self, user_id):
-        raw_json = self.twitter_client.get_user(user_id)
+    async def close(self):
+        for task in self._refresh_tasks:
+            task.cancel()
+        await self.twitter_client.close()
 
+    async def get_users(self, user_ids: list[str]) -> "TwitterUsersLookup":
         """
-
-        {
-          "data": {
-            "location": "Blockchain",
-            "name": "Guava",
-            "created_at": "2020-07-10T09:31:47.000Z",
-            "verified": false,
-            "username": "0xGuava",
-            "description": "Blockchain enthusiast 🔗",
-            "id": "1281521441025011715",
-            "public_metrics": {
-              "followers_count": 778,
-              "following_count": 532,
-              "tweet_count": 13651,
-              "listed_count": 14,
-              "like_count": 8362
-            },
-            "profile_image_url": "https://pbs.twimg.com/profile_images/1651483732295942147/yR3HweiQ_normal.jpg",
-            "protected": false
-          }
-        }
-
+        Resolve users, serving them from the user cache when possible.
+        Stale cache entries are returned as is and refreshed in the background.
         """
+        if self.user_cache is None:
+            return await self._lookup_users(user_ids)
+
+        user_ids = list(dict.fromkeys(user_ids))
+        cached_users, stale_ids = await self.user_cache.get_many(user_ids)
+        self._schedule_users_refresh(stale_ids)
+
+        missing_ids = [user_id for user_id in user_ids if user_id not in cached_users]
+        lookup = await self._lookup_users(missing_ids) if missing_ids else TwitterUsersLookup()
+        await self.user_cache.set_many({user_id: user.model_dump() for user_id, user in lookup.users.items()})
+
+        for user_id, user in cached_users.items():
+            lookup.users[user_id] = TwitterUser(**user)
+
+        logger.debug(f"Twitter user cache", cached=len(cached_users), stale=len(stale_ids), fetched=len(missing_ids))
+        return lookup
+
+    def _schedule_users_refresh(self, user_ids: set[str]):
+        user_ids = user_ids - self._refreshing_user_ids
+        if not user_ids:
+            return
+
+        async def refresh():
+            try:
+                lookup = await self._lookup_users(list(user_ids))
+                await self.user_cache.set_many({user_id: user.model_dump() for user_id, user in lookup.users.items()})
+            except Exception as e:
+                logger.warning(f"Failed to refresh twitter users", error=e)
+            finally:
+                self._refreshing_user_ids.difference_update(user_ids)
+
+        self._refreshing_user_ids.update(user_ids)
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _lookup_users(self, user_ids: list[str]) -> "TwitterUsersLookup":
+        """
+        Resolve users with the multi-id lookup endpoint, up to MAX_IDS_PER_LOOKUP ids per request.
+        Users which could not be resolved are reported in `errors`, keyed by user id.
+        Ids of requests which failed as a whole are also listed in `failed_ids`.
+        """
+        lookup = TwitterUsersLookup()
+        await self._lookup(user_ids, self.twitter_client.get_users, lambda data, raw_json: self._parse_user(data), lookup.users, lookup, "user")
+        return lookup
 
+    @staticmethod
+    def _parse_user(data) -> "TwitterUser":
         json = {
-            "user_id": raw_json["data"]["id"],
-            "user_name": raw_json["data"]["username"],
-            "verified": raw_json["data"]["verified"],
-            "followers_count": raw_json["data"]["public_metrics"]["followers_count"],
-            "following_count": raw_json["data"]["public_metrics"]["following_count"],
-            "tweet_count": raw_json["data"]["public_metrics"]["tweet_count"],
-            "listed_count": raw_json["data"]["public_metrics"]["listed_count"],
-            "like_count": raw_json["data"]["public_metrics"]["like_count"],
-            "description": raw_json["data"]["description"]
+            "user_id": data["id"],
+            "user_name": data["username"],
+            "verified": data["verified"],
+            "followers_count": data["public_metrics"]["followers_count"],
+            "following_count": data["public_metrics"]["following_count"],
+            "tweet_count": data["public_metrics"]["tweet_count"],
+            "listed_count": data["public_metrics"]["listed_count"],
+            "like_count": data["public_metrics"]["like_count"],
+            "description": data["description"]
         }
 
         return TwitterUser(**json)
 
-
-    def get_tweet_details(self, tweet_id):
-        raw_json = self.twitter_client.get_tweet_details(tweet_id)
-        if "errors" in raw_json:
-            logger.error(f"get_tweet_details: Request returned an error: {raw_json['errors']}")
-            return None
-                    
+    async def get_tweets(self, tweet_ids: list[str]) -> "TweetsLookup":
         """
-        {
-          "data": {
-            "context_annotations": [
-              {
-                "domain": {
-                  "id": "30",
-                  "name": "Entities [Entity Service]",
-                  "description": "Entity Service top level domain, every item that is in Entity Service should be in this domain"
-                },
-                "entity": {
-                  "id": "781974596752842752",
-                  "name": "Services"
-                }
-              },
-              {
-                "domain": {
-                  "id": "46",
-                  "name": "Business Taxonomy",
-                  "description": "Categories within Brand Verticals that narrow down the scope of Brands"
-                },
-                "entity": {
-                  "id": "1557696940178935808",
-                  "name": "Gaming Business",
-                  "description": "Brands, companies, advertisers and every non-person handle with the profit intent related to offline and online games such as gaming consoles, tabletop games, video game publishers"
-                }
-              },
-              {
-                "domain": {
-                  "id": "48",
-                  "name": "Product",
-                  "description": "Products created by Brands.  Examples: Ford Explorer, Apple iPhone."
-                },
-                "entity": {
-                  "id": "1412579054855671809",
-                  "name": "Google Innovation"
-                }
-              }
-            ],
-            "public_metrics": {
-              "retweet_count": 4,
-              "reply_count": 5,
-              "like_count": 6,
-              "quote_count": 0,
-              "bookmark_count": 0,
-              "impression_count": 265
-            },
-            "created_at": "2024-09-20T19:52:53.000Z",
-            "text": "𝗧𝗿𝗮𝗻𝘀𝗳𝗼𝗿𝗺𝗶𝗻𝗴 𝗔𝗜 𝗜𝗻𝗳𝗿𝗮𝘀𝘁𝗿𝘂𝗰𝘁𝘂𝗿𝗲: 𝗖𝗼𝗺𝗺𝘂𝗻𝗲'𝘀 𝗩𝗶𝘀𝗶𝗼𝗻 𝗳𝗼𝗿 𝗮 𝗗𝗲𝗰𝗲𝗻𝘁𝗿𝗮𝗹𝗶𝘇𝗲𝗱 𝗖𝗲𝗻𝘀𝗼𝗿𝘀𝗵𝗶𝗽-𝗥𝗲𝘀𝗶𝘀𝘁𝗮𝗻𝘁 𝗙𝘂𝘁𝘂𝗿𝗲.\n\n@communeaidotorg is a peer-to-peer protocol and stake-based marketplace for modular, on-chain… https://t.co/sKi9bHHlYy https://t.co/G967QMY9pz",
-            "edit_controls": {
-              "edits_remaining": 5,
-              "is_edit_eligible": false,
-              "editable_until": "2024-09-20T20:52:53.000Z"
-            },
-            "entities": {
-              "urls": [
-                {
-                  "start": 194,
-                  "end": 217,
-                  "url": "https://t.co/sKi9bHHlYy",
-                  "expanded_url": "https://twitter.com/i/web/status/1837218394036133951",
-                  "display_url": "x.com/i/web/status/1…"
-                },
-                {
-                  "start": 218,
-                  "end": 241,
-                  "url": "https://t.co/G967QMY9pz",
-                  "expanded_url": "https://twitter.com/0xGuava/status/1837218394036133951/photo/1",
-                  "display_url": "pic.x.com/g967qmy9pz",
-                  "media_key": "3_1837218363501580288"
-                }
-              ],
-              "mentions": [
-                {
-                  "start": 99,
-                  "end": 115,
-                  "username": "communeaidotorg",
-                  "id": "1620418337854349313"
-                }
-              ]
-            },
-            "reply_settings": "everyone",
-            "note_tweet": {
-              "entities": {
-                "mentions": [
-                  {
-                    "start": 99,
-                    "end": 115,
-                    "username": "communeaidotorg",
-                    "id": "1620418337854349313"
-                  }
-                ]
-              },
-              "text": "𝗧𝗿𝗮𝗻𝘀𝗳𝗼𝗿𝗺𝗶𝗻𝗴 𝗔𝗜 𝗜𝗻𝗳𝗿𝗮𝘀𝘁𝗿𝘂𝗰𝘁𝘂𝗿𝗲: 𝗖𝗼𝗺𝗺𝘂𝗻𝗲'𝘀 𝗩𝗶𝘀𝗶𝗼𝗻 𝗳𝗼𝗿 𝗮 𝗗𝗲𝗰𝗲𝗻𝘁𝗿𝗮𝗹𝗶𝘇𝗲𝗱 𝗖𝗲𝗻𝘀𝗼𝗿𝘀𝗵𝗶𝗽-𝗥𝗲𝘀𝗶𝘀𝘁𝗮𝗻𝘁 𝗙𝘂𝘁𝘂𝗿𝗲.\n\n@communeaidotorg is a peer-to-peer protocol and stake-based marketplace for modular, on-chain identifiers (Modules) linked to off-chain computing resources.\n\nWhat are Modules?\n\nModules are flexible, on-chain identifiers that represent:\n- AI models - Datasets - Storage solutions - Data scrapers - Raw computing power - Any computable resource (API-based)"
-            },
-            "id": "1837218394036133951",
-            "edit_history_tweet_ids": [
-              "1837218394036133951"
-            ],
-            "possibly_sensitive": false,
-            "conversation_id": "1837218394036133951",
-            "attachments": {
-              "media_keys": [
-                "3_1837218363501580288"
-              ]
-            },
-            "lang": "en",
-            "author_id": "1281521441025011715"
-          },
-          "includes": {
-            "media": [
-              {
-                "media_key": "3_1837218363501580288",
-                "type": "photo"
-              }
-            ],
-            "users": [
-              {
-                "username": "0xGuava",
-                "id": "1281521441025011715",
-                "profile_image_url": "https://pbs.twimg.com/profile_images/1651483732295942147/yR3HweiQ_normal.jpg",
-                "name": "Guava"
-              },
-              {
-                "username": "communeaidotorg",
-                "id": "1620418337854349313",
-                "profile_image_url": "https://pbs.twimg.com/profile_images/1824202302510579712/wa9JZFTz_normal.jpg",
-                "name": "commune.ai"
-              }
-            ],
-            "tweets": [
-              {
-                "context_annotations": [
-                  {
-                    "domain": {
-                      "id": "30",
-                      "name": "Entities [Entity Service]",
-                      "description": "Entity Service top level domain, every item that is in Entity Service should be in this domain"
-                    },
-                    "entity": {
-                      "id": "781974596752842752",
-                      "name": "Services"
-                    }
-                  },
-                  {
-                    "domain": {
-                      "id": "46",
-                      "name": "Business Taxonomy",
-                      "description": "Categories within Brand Verticals that narrow down the scope of Brands"
-                    },
-                    "entity": {
-                      "id": "1557696940178935808",
-                      "name": "Gaming Business",
-                      "description": "Brands, companies, advertisers and every non-person handle with the profit intent related to offline and online games such as gaming consoles, tabletop games, video game publishers"
-                    }
-                  },
-                  {
-                    "domain": {
-                      "id": "48",
-                      "name": "Product",
-                      "description": "Products created by Brands.  Examples: Ford Explorer, Apple iPhone."
-                    },
-                    "entity": {
-                      "id": "1412579054855671809",
-                      "name": "Google Innovation"
-                    }
-                  }
-                ],
-                "public_metrics": {
-                  "retweet_count": 4,
-                  "reply_count": 5,
-                  "like_count": 6,
-                  "quote_count": 0,
-                  "bookmark_count": 0,
-                  "impression_count": 265
-                },
-                "created_at": "2024-09-20T19:52:53.000Z",
-                "text": "𝗧𝗿𝗮𝗻𝘀𝗳𝗼𝗿𝗺𝗶𝗻𝗴 𝗔𝗜 𝗜𝗻𝗳𝗿𝗮𝘀𝘁𝗿𝘂𝗰𝘁𝘂𝗿𝗲: 𝗖𝗼𝗺𝗺𝘂𝗻𝗲'𝘀 𝗩𝗶𝘀𝗶𝗼𝗻 𝗳𝗼𝗿 𝗮 𝗗𝗲𝗰𝗲𝗻𝘁𝗿𝗮𝗹𝗶𝘇𝗲𝗱 𝗖𝗲𝗻𝘀𝗼𝗿𝘀𝗵𝗶𝗽-𝗥𝗲𝘀𝗶𝘀𝘁𝗮𝗻𝘁 𝗙𝘂𝘁𝘂𝗿𝗲.\n\n@communeaidotorg is a peer-to-peer protocol and stake-based marketplace for modular, on-chain… https://t.co/sKi9bHHlYy https://t.co/G967QMY9pz",
-                "edit_controls": {
-                  "edits_remaining": 5,
-                  "is_edit_eligible": false,
-                  "editable_until": "2024-09-20T20:52:53.000Z"
-                },
-                "entities": {
-                  "urls": [
-                    {
-                      "start": 194,
-                      "end": 217,
-                      "url": "https://t.co/sKi9bHHlYy",
-                      "expanded_url": "https://twitter.com/i/web/status/1837218394036133951",
-                      "display_url": "x.com/i/web/status/1…"
-                    },
-                    {
-                      "start": 218,
-                      "end": 241,
-                      "url": "https://t.co/G967QMY9pz",
-                      "expanded_url": "https://twitter.com/0xGuava/status/1837218394036133951/photo/1",
-                      "display_url": "pic.x.com/g967qmy9pz",
-                      "media_key": "3_1837218363501580288"
-                    }
-                  ],
-                  "mentions": [
-                    {
-                      "start": 99,
-                      "end": 115,
-                      "username": "communeaidotorg",
-                      "id": "1620418337854349313"
-                    }
-                  ]
-                },
-                "reply_settings": "everyone",
-                "note_tweet": {
-                  "entities": {
-                    "mentions": [
-                      {
-                        "start": 99,
-                        "end": 115,
-                        "username": "communeaidotorg",
-                        "id": "1620418337854349313"
-                      }
-                    ]
-                  },
-                  "text": "𝗧𝗿𝗮𝗻𝘀𝗳𝗼𝗿𝗺𝗶𝗻𝗴 𝗔𝗜 𝗜𝗻𝗳𝗿𝗮𝘀𝘁𝗿𝘂𝗰𝘁𝘂𝗿𝗲: 𝗖𝗼𝗺𝗺𝘂𝗻𝗲'𝘀 𝗩𝗶𝘀𝗶𝗼𝗻 𝗳𝗼𝗿 𝗮 𝗗𝗲𝗰𝗲𝗻𝘁𝗿𝗮𝗹𝗶𝘇𝗲𝗱 𝗖𝗲𝗻𝘀𝗼𝗿𝘀𝗵𝗶𝗽-𝗥𝗲𝘀𝗶𝘀𝘁𝗮𝗻𝘁 𝗙𝘂𝘁𝘂𝗿𝗲.\n\n@communeaidotorg is a peer-to-peer protocol and stake-based marketplace for modular, on-chain identifiers (Modules) linked to off-chain computing resources.\n\nWhat are Modules?\n\nModules are flexible, on-chain identifiers that represent:\n- AI models - Datasets - Storage solutions - Data scrapers - Raw computing power - Any computable resource (API-based)"
-                },
-                "id": "1837218394036133951",
-                "edit_history_tweet_ids": [
-                  "1837218394036133951"
-                ],
-                "possibly_sensitive": false,
-                "conversation_id": "1837218394036133951",
-                "attachments": {
-                  "media_keys": [
-                    "3_1837218363501580288"
-                  ]
-                },
-                "lang": "en",
-                "author_id": "1281521441025011715"
-              }
-            ]
-          }
-        }
+        Resolve tweets with the multi-id lookup endpoint, up to MAX_IDS_PER_LOOKUP ids per request.
+        Tweets which could not be resolved are reported in `errors`, keyed by tweet id.
+        Ids of requests which failed as a whole are also listed in `failed_ids`.
         """
+        lookup = TweetsLookup()
+        await self._lookup(tweet_ids, self.twitter_client.get_tweets, self._parse_tweet_item, lookup.tweets, lookup, "tweet")
+        return lookup
 
-        tweet_text = raw_json["data"]["text"]
-        user_id = raw_json["data"]["author_id"]
-        public_metrics = raw_json["data"]["public_metrics"]
-        created_at = raw_json["data"]["created_at"]
-        users = raw_json["includes"]["users"]
+    @staticmethod
+    async def _lookup(ids: list[str], get_chunk, parse, found: dict, lookup, kind: str):
+        """
+        Resolves ids with a multi-id lookup call, up to MAX_IDS_PER_LOOKUP ids per request, concurrently.
+        Items parsed by `parse(data, raw_json)` go to `found`, keyed by id, the others to `lookup.errors`.
+        """
+        ids = list(dict.fromkeys(ids))
+
+        async def fetch_chunk(chunk):
+            try:
+                raw_json = await get_chunk(chunk)
+            except Exception as e:
+                for item_id in chunk:
+                    lookup.errors[item_id] = str(e)
+                    lookup.failed_ids.add(item_id)
+                return
+
+            for data in raw_json.get("data", []):
+                try:
+                    found[data["id"]] = parse(data, raw_json)
+                except Exception as e:
+                    # A malformed item only fails its own id, and not as the miner's fault
+                    item_id = data.get("id") if isinstance(data, dict) else None
+                    logger.warning(f"Failed to parse {kind}", id=item_id, error=e)
+                    if item_id is not None:
+                        lookup.errors[item_id] = f"Malformed {kind}: {e}"
+                        lookup.failed_ids.add(item_id)
+            for error in raw_json.get("errors", []):
+                lookup.errors[_error_id(error)] = _error_detail(error)
+
+        await asyncio.gather(*[fetch_chunk(chunk) for chunk in _chunks(ids, MAX_IDS_PER_LOOKUP)])
+
+        for item_id in ids:
+            if item_id not in found and item_id not in lookup.errors:
+                lookup.errors[item_id] = f"{kind.capitalize()} not returned by lookup"
+
+    @classmethod
+    def _parse_tweet_item(cls, data, raw_json) -> "Tweet":
+        return cls._parse_tweet(data, raw_json.get("includes", {}).get("users", []))
+
+    @staticmethod
+    def _parse_tweet(data, users) -> "Tweet":
+        tweet_text = data["text"]
+        user_id = data["author_id"]
+        public_metrics = data["public_metrics"]
+        created_at = data["created_at"]
         username = None
         for user in users:
             if user["id"] == user_id:
                 username = f"@{user['username']}"
 
         json = {
-            "tweet_id": tweet_id,
+            "tweet_id": data["id"],
             "created_at": created_at,
             "username": username,
             "tweet_text": tweet_text,
@@ -414,3 +282,27 @@ class Tweet(BaseModel):
     bookmark_count: int
     impression_count: int
 
+
+class TwitterUsersLookup(BaseModel):
+    users: dict[str, TwitterUser] = {}
+    errors: dict[str, str] = {}
+    failed_ids: set[str] = set()
+
+
+class TweetsLookup(BaseModel):
+    tweets: dict[str, Tweet] = {}
+    errors: dict[str, str] = {}
+    failed_ids: set[str] = set()
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _error_id(error: dict) -> str:
+    return str(error.get("resource_id") or error.get("value"))
+
+
+def _error_detail(error: dict) -> str:
+    return error.get("detail") or error.get("title") or "Unknown error"
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import Mapping, Optional
+from loguru import logger
+from src.subnet.validator._config import ValidatorSettings
+
+
+class RateLimitBucket:
+    """
+    Quota left for one bearer token on one endpoint.
+
+    Twitter uses fixed windows: once `reset_at` passes, the full limit is available again.
+    """
+
+    def __init__(self, limit: int, period: int):
+        self.limit = limit
+        self.period = period
+        self.remaining = limit
+        self.reset_at = time.time() + period
+
+    def refresh(self, now: float):
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.period
+
+    def update(self, limit: Optional[int], remaining: Optional[int], reset_at: Optional[float]):
+        if limit is not None:
+            self.limit = limit
+
+        if reset_at is not None and reset_at != self.reset_at:
+            # A new window started, the header value is the source of truth
+            self.reset_at = reset_at
+            if remaining is not None:
+                self.remaining = remaining
+        elif remaining is not None:
+            # Same window, keep the local count if it already accounts for requests still in flight
+            self.remaining = min(self.remaining, remaining)
+
+
+class BearerTokenScheduler:
+    """
+    Hands out bearer tokens per endpoint, picking the token with the most quota left.
+
+    Quota is tracked per (token, endpoint) and corrected from the `x-rate-limit-*` response headers.
+    When every token is exhausted, callers await the earliest window reset instead of blocking the event loop.
+    """
+
+    def __init__(self, settings: ValidatorSettings):
+        self.tokens = [token for token in settings.TWITTER_BEARER_TOKENS.split(";") if token]
+        if not self.tokens:
+            raise ValueError("TWITTER_BEARER_TOKENS must contain at least one bearer token")
+        self.default_limit = settings.TWITTER_RATE_LIMIT_CALLS
+        self.default_period = settings.TWITTER_RATE_LIMIT_PERIOD
+        self._buckets: dict[tuple[str, str], RateLimitBucket] = {}
+        self._capacity_changed = asyncio.Event()
+
+    def _bucket(self, token: str, endpoint: str) -> RateLimitBucket:
+        key = (token, endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = RateLimitBucket(self.default_limit, self.default_period)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, endpoint: str) -> str:
+        while True:
+            now = time.time()
+            buckets = []
+            for token in self.tokens:
+                bucket = self._bucket(token, endpoint)
+                bucket.refresh(now)
+                buckets.append((token, bucket))
+
+            token, bucket = max(buckets, key=lambda item: item[1].remaining)
+            if bucket.remaining > 0:
+                bucket.remaining -= 1
+                return token
+
+            wait_time = max(min(bucket.reset_at for _, bucket in buckets) - now, 0.1)
+            logger.info(f"Twitter rate limit reached, waiting for capacity", endpoint=endpoint, wait_time=wait_time)
+            self._capacity_changed.clear()
+            try:
+                await asyncio.wait_for(self._capacity_changed.wait(), timeout=wait_time)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, token: str, endpoint: str):
+        """Gives back the quota taken by `acquire` for a request which failed without being rate limited."""
+        bucket = self._bucket(token, endpoint)
+        had_capacity = bucket.remaining > 0
+        bucket.remaining = min(bucket.remaining + 1, bucket.limit)
+
+        if bucket.remaining > 0 and not had_capacity:
+            self._capacity_changed.set()
+
+    def update(self, token: str, endpoint: str, headers: Mapping[str, str], status: int):
+        limit = _header_int(headers, "x-rate-limit-limit")
+        remaining = _header_int(headers, "x-rate-limit-remaining")
+        reset_at = _header_int(headers, "x-rate-limit-reset")
+
+        if status == 429 and remaining is None:
+            remaining = 0
+
+        bucket = self._bucket(token, endpoint)
+        had_capacity = bucket.remaining > 0
+        bucket.update(limit, remaining, float(reset_at) if reset_at is not None else None)
+
+        if bucket.remaining > 0 and not had_capacity:
+            self._capacity_changed.set()
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
@@ -0,0 +1,159 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+from loguru import logger
+from src.subnet.validator._config import ValidatorSettings
+
+USER_CACHE_BACKEND_MEMORY = "memory"
+USER_CACHE_BACKEND_REDIS = "redis"
+USER_CACHE_BACKEND_NONE = "none"
+
+
+class InMemoryUserCacheBackend:
+    """LRU bounded mapping of user id to (user json, fetched_at)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    async def get_many(self, user_ids: list[str]) -> dict[str, tuple[dict, float]]:
+        entries = {}
+        for user_id in user_ids:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                entries[user_id] = entry
+        return entries
+
+    async def set_many(self, users: dict[str, dict], fetched_at: float):
+        for user_id, user in users.items():
+            self._entries[user_id] = (user, fetched_at)
+            self._entries.move_to_end(user_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class RedisUserCacheBackend:
+    """
+    Stores users in the validator Redis instance.
+
+    Keys expire once they are too old to be served even as stale entries, and a sorted set of
+    fetch times is used to evict the oldest users when the cache grows beyond `max_size`.
+    """
+
+    KEY_PREFIX = "twitter_user:"
+    INDEX_KEY = "twitter_user_index"
+
+    def __init__(self, redis_url: str, max_size: int, expire_seconds: int):
+        # Imported here so the in-memory backend works without a usable aioredis install
+        import aioredis
+
+        self.redis = aioredis.from_url(redis_url)
+        self.max_size = max_size
+        self.expire_seconds = expire_seconds
+
+    async def get_many(self, user_ids: list[str]) -> dict[str, tuple[dict, float]]:
+        if not user_ids:
+            return {}
+
+        values = await self.redis.mget([f"{self.KEY_PREFIX}{user_id}" for user_id in user_ids])
+        entries = {}
+        for user_id, value in zip(user_ids, values):
+            if value is None:
+                continue
+            data = json.loads(value)
+            entries[user_id] = (data["user"], data["fetched_at"])
+        return entries
+
+    async def set_many(self, users: dict[str, dict], fetched_at: float):
+        if not users:
+            return
+
+        pipeline = self.redis.pipeline()
+        for user_id, user in users.items():
+            value = json.dumps({"user": user, "fetched_at": fetched_at})
+            pipeline.set(f"{self.KEY_PREFIX}{user_id}", value, ex=self.expire_seconds)
+            pipeline.zadd(self.INDEX_KEY, {user_id: fetched_at})
+        pipeline.zremrangebyscore(self.INDEX_KEY, 0, fetched_at - self.expire_seconds)
+        pipeline.zcard(self.INDEX_KEY)
+        results = await pipeline.execute()
+
+        size = results[-1]
+        if size > self.max_size:
+            evicted = await self.redis.zrange(self.INDEX_KEY, 0, size - self.max_size - 1)
+            if evicted:
+                evicted = [user_id.decode() if isinstance(user_id, bytes) else user_id for user_id in evicted]
+                pipeline = self.redis.pipeline()
+                pipeline.delete(*[f"{self.KEY_PREFIX}{user_id}" for user_id in evicted])
+                pipeline.zrem(self.INDEX_KEY, *evicted)
+                await pipeline.execute()
+
+
+class TwitterUserCache:
+    """
+    Twitter user profiles keyed by user id.
+
+    Entries younger than `ttl` are fresh. Entries younger than `ttl + stale_ttl` are still served,
+    but reported as stale so the caller can refresh them in the background. Older entries are misses.
+    """
+
+    def __init__(self, backend, ttl: int, stale_ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get_many(self, user_ids: list[str]) -> tuple[dict[str, dict], set[str]]:
+        """
+        Returns the cached users and the subset of their ids which are stale.
+        """
+        now = time.time()
+        try:
+            entries = await self.backend.get_many(user_ids)
+        except Exception as e:
+            logger.warning(f"Failed to read twitter user cache", error=e)
+            entries = {}
+
+        users = {}
+        stale_ids = set()
+        for user_id, (user, fetched_at) in entries.items():
+            age = now - fetched_at
+            if age >= self.ttl + self.stale_ttl:
+                continue
+            users[user_id] = user
+            if age >= self.ttl:
+                stale_ids.add(user_id)
+
+        self.hits += len(users) - len(stale_ids)
+        self.stale_hits += len(stale_ids)
+        self.misses += len(user_ids) - len(users)
+        return users, stale_ids
+
+    async def set_many(self, users: dict[str, dict]):
+        try:
+            await self.backend.set_many(users, time.time())
+        except Exception as e:
+            logger.warning(f"Failed to write twitter user cache", error=e)
+
+
+def create_user_cache(settings: ValidatorSettings) -> Optional[TwitterUserCache]:
+    backend_type = settings.TWITTER_USER_CACHE_BACKEND
+    if backend_type == USER_CACHE_BACKEND_NONE:
+        return None
+
+    if backend_type == USER_CACHE_BACKEND_MEMORY:
+        backend = InMemoryUserCacheBackend(settings.TWITTER_USER_CACHE_MAX_SIZE)
+    elif backend_type == USER_CACHE_BACKEND_REDIS:
+        backend = RedisUserCacheBackend(
+            settings.REDIS_URL,
+            settings.TWITTER_USER_CACHE_MAX_SIZE,
+            settings.TWITTER_USER_CACHE_TTL + settings.TWITTER_USER_CACHE_STALE_TTL,
+        )
+    else:
+        raise ValueError(f"Unsupported twitter user cache backend: {backend_type}")
+
+    return TwitterUserCache(backend, settings.TWITTER_USER_CACHE_TTL, settings.TWITTER_USER_CACHE_STALE_TTL)
@@ -1,26 +1,50 @@
 import traceback
 import asyncio
 import re
-import threading
-import time
-from datetime import datetime, timedelta
-from typing import cast, Dict, List
+from dataclasses import dataclass
+from functools import partial
+from datetime import datetime
+from typing import List, Optional
 from communex.client import CommuneClient  # type: ignore
-from communex.misc import get_map_modules
-from communex.module.client import ModuleClient  # type: ignore
 from communex.module.module import Module  # type: ignore
 from communex.types import Ss58Address  # type: ignore
 from loguru import logger
 from substrateinterface import Keypair  # type: ignore
 from ._config import ValidatorSettings
-from .helpers import raise_exception_if_not_registered, get_ip_port, cut_to_max_allowed_weights
-from .llm.base_llm import BaseLLM
-from .scoring import ScoreCalculator
-from .twitter import TwitterService, TwitterUser
+from .helpers import raise_exception_if_not_registered, cut_to_max_allowed_weights
+from .llm.sentiment_service import SentimentService
+from .metagraph import MetagraphCache
+from .miner_state import MinerStateCache
+from .miner_blacklist import MinerBlacklist, BLACKLIST_REASON_UNVERIFIED_USER, BLACKLIST_REASON_MULTIPLE_ADDRESSES, \
+    BLACKLIST_REASON_KEY_NOT_IN_DESCRIPTION, BLACKLIST_REASON_TWEET_NOT_FOUND
+from .module_client_pool import ModuleClientPool
+from .fanout import MinerFanOut
+from .pipeline import Pipeline, Stage
+from .scheduler import StepScheduler, SCHEDULE_ALIGN_BLOCK
+from .scoring import DECAY_END, ScoreCalculator, NormalizationSnapshot, metadata_to_columns
+from .twitter import TwitterService, TwitterUser, Tweet, MAX_IDS_PER_LOOKUP
+from .weight_submitter import WeightSubmitter
 from .weights_storage import WeightsStorage
 from src.subnet.validator.database.models.miner_discovery import MinerDiscoveryManager
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
-from ..protocol import TwitterPost, TwitterPostMetadata
+from ..protocol import TwitterPost, TwitterPostMetadata, TwitterPostsPage
+
+
+@dataclass
+class MinerChallenge:
+    uid: int
+    miner_key: str
+    miner_name: str
+    module_addr: tuple
+    twitter_posts: Optional[List[TwitterPost]] = None
+    paginated: bool = False
+    post: Optional[TwitterPost] = None
+    user: Optional[TwitterUser] = None
+    tweet: Optional[Tweet] = None
+    positivity: Optional[float] = None
+    similarity: Optional[float] = None
+    metadata: Optional[TwitterPostMetadata] = None
+    score: float = 0
 
 
 class Validator(Module):
@@ -34,10 +58,15 @@ class Validator(Module):
             miner_discovery_manager: MinerDiscoveryManager,
             miner_receipt_manager: MinerReceiptManager,
             score_calculator: ScoreCalculator,
-            llm: BaseLLM,
+            sentiment_service: SentimentService,
             twitter_service: TwitterService,
             query_timeout: int = 60,
-
+            miner_fanout: Optional[MinerFanOut] = None,
+            module_client_pool: Optional[ModuleClientPool] = None,
+            metagraph_cache: Optional[MetagraphCache] = None,
+            miner_blacklist: Optional[MinerBlacklist] = None,
+            weight_submitter: Optional[WeightSubmitter] = None,
+            miner_state_cache: Optional[MinerStateCache] = None,
     ) -> None:
         super().__init__()
 
@@ -45,139 +74,289 @@ class Validator(Module):
         self.client = client
         self.key = key
         self.netuid = netuid
-        self.llm = llm
+        self.sentiment_service = sentiment_service
         self.query_timeout = query_timeout
         self.weights_storage = weights_storage
         self.miner_discovery_manager = miner_discovery_manager
         self.score_calculator = score_calculator
         self.twitter_service = twitter_service
-        self.terminate_event = threading.Event()
-        self.miner_blacklist = []
+        self.miner_fanout = miner_fanout or MinerFanOut(max_in_flight=32, max_deadline=query_timeout)
+        self.module_client_pool = module_client_pool or ModuleClientPool(key)
+        self.metagraph_cache = metagraph_cache or MetagraphCache(client, netuid)
+        self.scheduler: Optional[StepScheduler] = None
+        self.miner_blacklist = miner_blacklist or MinerBlacklist()
+        # Without a submitter weights are voted synchronously from set_weights
+        self.weight_submitter = weight_submitter
+        self.miner_state_cache = miner_state_cache or MinerStateCache()
+        # Tweets which already have a receipt, warmed at startup and extended as receipts are stored
+        self.scored_tweet_ids: set[str] = set()
+
+    async def _get_twitter_posts(self, challenge: MinerChallenge, timeout: float) -> List[TwitterPost]:
+        module_ip, module_port = challenge.module_addr
+        client = self.module_client_pool.get(module_ip, module_port, challenge.miner_key)
+        feed = self.miner_state_cache.get_feed(challenge.miner_key)
+        feed.prune(self.scored_tweet_ids)
+        params = {"limit": max(self.miner_state_cache.max_pending_posts - len(feed.posts), 0)}
+        if feed.cursor is not None:
+            params["cursor"] = feed.cursor
+        else:
+            # A new feed, e.g. after a restart, skips the posts too old to score anything
+            params["since"] = (datetime.utcnow() - DECAY_END).isoformat()
+        twitter_posts = await client.call(
+            "twitter_posts",
+            challenge.miner_key,
+            params,
+            timeout=timeout,
+        )
+
+        logger.debug(f"Miner got discovery", miner_key=challenge.miner_key, twitter_posts=twitter_posts)
+
+        if isinstance(twitter_posts, list):
+            # Miners predating pagination ignore the parameters and answer with all their posts
+            self.miner_state_cache.discard_feed(challenge.miner_key)
+            return [TwitterPost(**post) for post in twitter_posts]
 
-    @staticmethod
-    def get_addresses(client: CommuneClient, netuid: int) -> dict[int, str]:
-        modules_adresses = client.query_map_address(netuid)
-        for id, addr in modules_adresses.items():
-            if addr.startswith('None'):
-                port = addr.split(':')[1]
-                modules_adresses[id] = f'0.0.0.0:{port}'
-        logger.debug(f"Got modules addresses", modules_adresses=modules_adresses)
-        return modules_adresses
-
-    async def _get_twitter_posts(self, client, miner_key) -> List[TwitterPost]:
-        try:
-            twitter_posts = await client.call(
-                "twitter_posts",
-                miner_key,
-                {},
-                timeout=self.query_timeout,
-            )
+        feed.extend(TwitterPostsPage(**twitter_posts))
+        challenge.paginated = True
+        return list(feed.posts)
+
+    async def _query_miners(self, challenges: List[MinerChallenge], reused: List[MinerChallenge]):
+        """
+        Fans out the twitter_posts call to all miners and yields the challenges in the order miners answer.
+
+        Miners answering the same posts as in their last challenge are not yielded but appended to `reused`:
+        they have no new post to challenge, so they score 0 without spending Twitter or LLM quota.
+        """
+        candidates = []
+        for challenge in challenges:
+            if challenge.miner_key in self.miner_blacklist:
+                logger.info(f"Miner is blacklisted, skipping", miner_key=challenge.miner_key, reason=self.miner_blacklist.get_reason(challenge.miner_key))
+                continue
+            candidates.append(challenge)
 
-            logger.debug(f"Miner got discovery", miner_key=miner_key, twitter_posts=twitter_posts)
+        async for challenge, twitter_posts, error in self.miner_fanout.stream(candidates, key=lambda c: c.miner_key, call=self._get_twitter_posts):
+            if error is not None:
+                logger.warning(f"Miner failed to get discovery", error=error, miner_key=challenge.miner_key)
+                continue
 
-            return [TwitterPost(**post) for post in twitter_posts]
-        except Exception as e:
-            logger.warning(f"Miner failed to get discovery", error=e, miner_key=miner_key, traceback=traceback.format_exc())
-            return None
+            logger.info(f"Challenging miner", miner_key=challenge.miner_key)
+            if not twitter_posts:
+                logger.info(f"Miner has no posts", miner_key=challenge.miner_key)
+                continue
 
-    async def _challenge_miner(self, miner_info):
-        start_time = time.time()
-        try:
-            connection, miner_metadata = miner_info
-            module_ip, module_port = connection
-            miner_key = miner_metadata['key']
-            client = ModuleClient(module_ip, int(module_port), self.key)
+            challenge.twitter_posts = twitter_posts
 
-            logger.info(f"Challenging miner", miner_key=miner_key)
+            # The pruned feed of a paginated miner only holds posts which were not scored yet, so it is always challenged
+            state = None if challenge.paginated else self.miner_state_cache.get_unchanged(challenge.miner_key, twitter_posts)
+            if state is not None:
+                logger.info(f"Miner posts did not change, no new posts to challenge", miner_key=challenge.miner_key)
+                reused.append(challenge)
+                continue
 
-            if miner_key in self.miner_blacklist:
-                logger.info(f"Miner is blacklisted, skipping", miner_key=miner_key)
-                return None
+            yield challenge
 
-            twitter_posts: List[TwitterPost] = await self._get_twitter_posts(client, miner_key)
-            if not twitter_posts:
-                logger.info(f"Miner has no posts", miner_key=miner_key)
-                return None
-
-            filtered_posts = [
-                post for post in twitter_posts
-                if not await self.miner_receipt_manager.check_if_tweet_was_scored(post.tweet_id)
-            ]
-
-            if not filtered_posts:
-                logger.info(f"No new posts to challenge", miner_key=miner_key)
-                return None
-
-            twitter_post = filtered_posts[0]
-
-            user: TwitterUser = self.twitter_service.get_user(twitter_post.user_id)
-            if not user.verified:
-                self.miner_blacklist.append(miner_key)
-                logger.info(f"User is not verified, blacklisting", miner_key=miner_key)
-                return None
-
-            addresses = re.findall(r'(?:1|5)[A-HJ-NP-Za-km-z1-9]{47}', user.description)
-            if len(addresses) > 1:
-                self.miner_blacklist.append(miner_key)
-                logger.info(f"More than one address in user description, blacklisting", miner_key=miner_key)
-                return None
-
-            if miner_key.lower().strip() not in [address.lower().strip() for address in addresses]:
-                self.miner_blacklist.append(miner_key)
-                logger.info(f"Miner key not in description, blacklisting", miner_key=miner_key)
-                return None
-
-            tweet_details = self.twitter_service.get_tweet_details(twitter_post.tweet_id)
-            if not tweet_details:
-                self.miner_blacklist.append(miner_key)
-                logger.info(f"Failed to get tweet details, blacklisting", miner_key=miner_key)
-                return None
-
-            positivity = self.llm.get_tweet_sentiment(tweet_details.tweet_text)
-            similarity = await self.miner_receipt_manager.check_tweet_similarity(tweet_details.tweet_text)
-
-            challenge_json = {
-                "user_id": twitter_post.user_id,
-                "user_name": user.user_name,
-                "miner_key": miner_key,
-
-                "user_followers": user.followers_count,
-                "user_following": user.following_count,
-                "user_tweets": user.tweet_count,
-                "user_likes": user.like_count,
-                "user_listed": user.listed_count,
-
-                "tweet_id": tweet_details.tweet_id,
-                "tweet_text": tweet_details.tweet_text,
-                "created_at": tweet_details.created_at,
-                "similarity": similarity,
-                "positivity": positivity,
-                "tweet_retweets": tweet_details.retweet_count,
-                "tweet_replies": tweet_details.reply_count,
-                "tweet_likes": tweet_details.like_count,
-                "tweet_quotes": tweet_details.quote_count,
-                "tweet_bookmarks": tweet_details.bookmark_count,
-                "tweet_impressions": tweet_details.impression_count,
-            }
+    async def _filter_stage(self, challenge: MinerChallenge) -> Optional[MinerChallenge]:
+        miner_key = challenge.miner_key
+        twitter_posts = challenge.twitter_posts
 
-            return TwitterPostMetadata(**challenge_json)
+        unknown_tweet_ids = {post.tweet_id for post in twitter_posts if post.tweet_id not in self.scored_tweet_ids}
+        if unknown_tweet_ids:
+            self.scored_tweet_ids.update(await self.miner_receipt_manager.get_scored_tweet_ids(unknown_tweet_ids))
 
-        except Exception as e:
-            logger.error(f"Failed to challenge miner", error=e, miner_key=miner_key, traceback=traceback.format_exc())
+        filtered_posts = [post for post in twitter_posts if post.tweet_id not in self.scored_tweet_ids]
+
+        if not filtered_posts:
+            logger.info(f"No new posts to challenge", miner_key=miner_key)
+            if not challenge.paginated:
+                self.miner_state_cache.store(miner_key, twitter_posts)
             return None
-        finally:
-            end_time = time.time()
-            execution_time = end_time - start_time
-            logger.info(f"Execution time for challenge_miner", execution_time=execution_time, miner_key=miner_key)
+
+        # Only answers without new posts are reused, the rest of a backlog is challenged in the next steps
+        self.miner_state_cache.discard(miner_key)
+        challenge.post = filtered_posts[0]
+        return challenge
+
+    def _verify_user(self, miner_key: str, user: Optional[TwitterUser], error: Optional[str]) -> bool:
+        if user is None:
+            logger.info(f"Failed to get user", miner_key=miner_key, error=error)
+            return False
+
+        if not user.verified:
+            self.miner_blacklist.add(miner_key, BLACKLIST_REASON_UNVERIFIED_USER)
+            logger.info(f"User is not verified, blacklisting", miner_key=miner_key)
+            return False
+
+        addresses = re.findall(r'(?:1|5)[A-HJ-NP-Za-km-z1-9]{47}', user.description)
+        if len(addresses) > 1:
+            self.miner_blacklist.add(miner_key, BLACKLIST_REASON_MULTIPLE_ADDRESSES)
+            logger.info(f"More than one address in user description, blacklisting", miner_key=miner_key)
+            return False
+
+        if miner_key.lower().strip() not in [address.lower().strip() for address in addresses]:
+            self.miner_blacklist.add(miner_key, BLACKLIST_REASON_KEY_NOT_IN_DESCRIPTION)
+            logger.info(f"Miner key not in description, blacklisting", miner_key=miner_key)
+            return False
+
+        return True
+
+    async def _users_stage(self, challenges: List[MinerChallenge]) -> List[MinerChallenge]:
+        users_lookup = await self.twitter_service.get_users([challenge.post.user_id for challenge in challenges])
+        logger.info(f"Resolved users", users=len(users_lookup.users), errors=len(users_lookup.errors))
+
+        verified = []
+        for challenge in challenges:
+            user_id = challenge.post.user_id
+            user = users_lookup.users.get(user_id)
+            if self._verify_user(challenge.miner_key, user, users_lookup.errors.get(user_id)):
+                challenge.user = user
+                verified.append(challenge)
+        return verified
+
+    async def _tweets_stage(self, challenges: List[MinerChallenge]) -> List[MinerChallenge]:
+        tweets_lookup = await self.twitter_service.get_tweets([challenge.post.tweet_id for challenge in challenges])
+        logger.info(f"Resolved tweets", tweets=len(tweets_lookup.tweets), errors=len(tweets_lookup.errors))
+
+        resolved = []
+        for challenge in challenges:
+            tweet_id = challenge.post.tweet_id
+            if tweet_id in tweets_lookup.failed_ids:
+                # The lookup request itself failed, the miner is not at fault
+                logger.info(f"Failed to get tweet details", miner_key=challenge.miner_key, error=tweets_lookup.errors.get(tweet_id))
+                continue
+
+            tweet_details = tweets_lookup.tweets.get(tweet_id)
+            if not tweet_details:
+                self.miner_blacklist.add(challenge.miner_key, BLACKLIST_REASON_TWEET_NOT_FOUND)
+                logger.info(f"Failed to get tweet details, blacklisting", miner_key=challenge.miner_key, error=tweets_lookup.errors.get(tweet_id))
+                continue
+
+            challenge.tweet = tweet_details
+            resolved.append(challenge)
+        return resolved
+
+    async def _sentiment_stage(self, batch: list[MinerChallenge]) -> list[MinerChallenge]:
+        scores = await self.sentiment_service.get_tweet_sentiments([challenge.tweet.tweet_text for challenge in batch])
+
+        scored = []
+        for challenge, score in zip(batch, scores):
+            if score is None:
+                logger.info(f"Skipping miner, failed to get tweet sentiment", miner_key=challenge.miner_key, tweet_id=challenge.tweet.tweet_id)
+                continue
+            challenge.positivity = score
+            scored.append(challenge)
+        return scored
+
+    async def _similarity_stage(self, challenge: MinerChallenge) -> MinerChallenge:
+        challenge.similarity = await self.miner_receipt_manager.check_tweet_similarity(challenge.tweet.tweet_text)
+        return challenge
+
+    @staticmethod
+    def _build_metadata(challenge: MinerChallenge) -> TwitterPostMetadata:
+        user = challenge.user
+        tweet_details = challenge.tweet
+
+        challenge_json = {
+            "user_id": challenge.post.user_id,
+            "user_name": user.user_name,
+            "miner_key": challenge.miner_key,
+
+            "user_followers": user.followers_count,
+            "user_following": user.following_count,
+            "user_tweets": user.tweet_count,
+            "user_likes": user.like_count,
+            "user_listed": user.listed_count,
+
+            "tweet_id": tweet_details.tweet_id,
+            "tweet_text": tweet_details.tweet_text,
+            "created_at": tweet_details.created_at,
+            "similarity": challenge.similarity,
+            "positivity": challenge.positivity,
+            "tweet_retweets": tweet_details.retweet_count,
+            "tweet_replies": tweet_details.reply_count,
+            "tweet_likes": tweet_details.like_count,
+            "tweet_quotes": tweet_details.quote_count,
+            "tweet_bookmarks": tweet_details.bookmark_count,
+            "tweet_impressions": tweet_details.impression_count,
+        }
+
+        return TwitterPostMetadata(**challenge_json)
+
+    async def _score_stage(self, batch: list[MinerChallenge], snapshot: NormalizationSnapshot) -> list[MinerChallenge]:
+        for challenge in batch:
+            challenge.metadata = self._build_metadata(challenge)
+
+        scores = self.score_calculator.score_batch(metadata_to_columns([challenge.metadata for challenge in batch]), snapshot)
+        assert (scores <= 100).all()
+        for challenge, score in zip(batch, scores):
+            challenge.score = float(score)
+        return batch
+
+    async def _persist_stage(self, batch: list[MinerChallenge]) -> list[MinerChallenge]:
+        await self.miner_discovery_manager.store_miner_metadata_batch([
+            {
+                'uid': challenge.uid,
+                'miner_key': challenge.miner_key,
+                'miner_name': challenge.miner_name,
+                'user_id': challenge.metadata.user_id,
+                'user_name': challenge.metadata.user_name,
+                'followers': challenge.metadata.user_followers,
+                'following': challenge.metadata.user_following,
+                'tweets': challenge.metadata.user_tweets,
+                'likes': challenge.metadata.user_likes,
+                'listed': challenge.metadata.user_listed,
+            }
+            for challenge in batch
+        ])
+        await self.miner_receipt_manager.store_miner_receipts([
+            {
+                'miner_key': challenge.miner_key,
+                'miner_name': challenge.miner_name,
+                'user_id': challenge.metadata.user_id,
+                'user_name': challenge.metadata.user_name,
+                'tweet_id': challenge.metadata.tweet_id,
+                'tweet_content': challenge.metadata.tweet_text,
+                'tweet_created_at': datetime.strptime(challenge.metadata.created_at, '%Y-%m-%dT%H:%M:%S.%fZ'),
+                'tweet_retweet_count': challenge.metadata.tweet_retweets,
+                'tweet_reply_count': challenge.metadata.tweet_replies,
+                'tweet_like_count': challenge.metadata.tweet_likes,
+                'tweet_quote_count': challenge.metadata.tweet_quotes,
+                'tweet_bookmark_count': challenge.metadata.tweet_bookmarks,
+                'tweet_impression_count': challenge.metadata.tweet_impressions,
+                'score': challenge.score,
+                'similarity': challenge.metadata.similarity,
+            }
+            for challenge in batch
+        ])
+        self.scored_tweet_ids.update(challenge.metadata.tweet_id for challenge in batch)
+        return batch
+
+    def _build_pipeline(self, settings: ValidatorSettings, snapshot: NormalizationSnapshot) -> Pipeline:
+        queue_size = settings.PIPELINE_QUEUE_SIZE
+        batch_wait = settings.PIPELINE_BATCH_WAIT
+        return Pipeline([
+            Stage("filter", self._filter_stage, concurrency=settings.PIPELINE_DB_CONCURRENCY, queue_size=queue_size),
+            Stage("users", self._users_stage, batch_size=MAX_IDS_PER_LOOKUP, batch_wait=batch_wait, queue_size=queue_size),
+            Stage("tweets", self._tweets_stage, batch_size=MAX_IDS_PER_LOOKUP, batch_wait=batch_wait, queue_size=queue_size),
+            Stage("sentiment", self._sentiment_stage, concurrency=settings.PIPELINE_LLM_CONCURRENCY, batch_size=settings.LLM_BATCH_SIZE, batch_wait=batch_wait, queue_size=queue_size),
+            Stage("similarity", self._similarity_stage, concurrency=settings.PIPELINE_DB_CONCURRENCY, queue_size=queue_size),
+            Stage("score", partial(self._score_stage, snapshot=snapshot), batch_size=queue_size, batch_wait=batch_wait, queue_size=queue_size),
+            Stage("persist", self._persist_stage, batch_size=queue_size, batch_wait=batch_wait, queue_size=queue_size),
+        ])
+
+    async def _update_miner_ranks(self, miners_module_info: dict[int, tuple]):
+        await self.miner_discovery_manager.update_miner_ranks([
+            (miner_metadata['key'], miner_metadata['name'], miner_metadata['emission'])
+            for _, miner_metadata in miners_module_info.values()
+        ])
 
     async def validate_step(self, netuid: int, settings: ValidatorSettings) -> None:
 
         score_dict: dict[int, float] = {}
         miners_module_info = {}
 
-        modules = cast(dict[str, Dict], get_map_modules(self.client, netuid=netuid, include_balances=False))
-        modules_addresses = self.get_addresses(self.client, netuid)
-        ip_ports = get_ip_port(modules_addresses)
+        metagraph = await self.metagraph_cache.get_snapshot()
+        modules = metagraph.modules
+        ip_ports = metagraph.ip_ports
 
         raise_exception_if_not_registered(self.key, modules)
 
@@ -194,64 +373,41 @@ class Validator(Module):
 
         logger.info(f"Found miners", miners_module_info=miners_module_info.keys())
 
-        for _, miner_metadata in miners_module_info.values():
-            await self.miner_discovery_manager.update_miner_rank(miner_metadata['key'], miner_metadata['name'], miner_metadata['emission'])
+        self.module_client_pool.sync_addresses({
+            miner_metadata['key']: module_addr for module_addr, miner_metadata in miners_module_info.values()
+        })
 
-        challenge_tasks = []
-        for uid, miner_info in miners_module_info.items():
-            challenge_tasks.append(self._challenge_miner(miner_info))
+        challenges = [
+            MinerChallenge(uid=uid, miner_key=miner_metadata['key'], miner_name=miner_metadata['name'], module_addr=module_addr)
+            for uid, (module_addr, miner_metadata) in miners_module_info.items()
+        ]
+        self.miner_state_cache.retain(challenge.miner_key for challenge in challenges)
 
-        responses = await asyncio.gather(*challenge_tasks)
+        # Every miner of the step is normalized against the same maxima, whatever gets stored meanwhile
+        snapshot = await self.score_calculator.get_normalization_snapshot()
+        pipeline = self._build_pipeline(settings, snapshot)
+        reused_challenges: List[MinerChallenge] = []
+        _, scored_challenges = await asyncio.gather(
+            self._update_miner_ranks(miners_module_info),
+            pipeline.run(self._query_miners(challenges, reused_challenges)),
+        )
 
-        for uid, miner_info, response in zip(miners_module_info.keys(), miners_module_info.values(), responses):
-            if not response:
-                score_dict[uid] = 0
-                continue
+        await self.miner_blacklist.flush()
 
-            if isinstance(response, TwitterPostMetadata):
-                _, miner_metadata = miner_info
-                miner_key = miner_metadata['key']
-                miner_name = miner_metadata['name']
-                score = await self.score_calculator.calculate_overall_score(response)
-                assert score <= 100
-                score_dict[uid] = score
-
-                await self.miner_discovery_manager.store_miner_metadata(
-                    uid,
-                    miner_key,
-                    miner_name,
-                    response.user_id,
-                    response.user_name,
-                    response.user_followers,
-                    response.user_following,
-                    response.user_tweets,
-                    response.user_likes,
-                    response.user_listed
-                )
-                await self.miner_receipt_manager.store_miner_receipt(
-                    miner_key,
-                    miner_name,
-                    response.user_id,
-                    response.user_name,
-                    response.tweet_id,
-                    response.tweet_text,
-                    datetime.strptime(response.created_at, '%Y-%m-%dT%H:%M:%S.%fZ'),
-                    response.tweet_retweets,
-                    response.tweet_replies,
-                    response.tweet_likes,
-                    response.tweet_quotes,
-                    response.tweet_bookmarks,
-                    response.tweet_impressions,
-                    score,
-                    response.similarity,
-                )
+        for challenge in reused_challenges + scored_challenges:
+            score_dict[challenge.uid] = challenge.score
+
+        self.module_client_pool.log_stats()
+        self.sentiment_service.log_stats()
+        self.miner_state_cache.log_stats()
 
         if not score_dict:
             logger.info("No miner managed to give an answer")
             return
 
         try:
-            self.set_weights(settings, score_dict, self.netuid, self.client, self.key)
+            # Reading and rotating the weights files, and voting without a submitter, block
+            await asyncio.to_thread(self.set_weights, settings, score_dict, self.netuid, self.client, self.key)
         except Exception as e:
             logger.error(f"Failed to set weights", error=e, traceback=traceback.format_exc())
 
@@ -294,23 +450,42 @@ class Validator(Module):
         weights = list(weighted_scores.values())
 
         if len(weighted_scores) > 0:
-            client.vote(key=key, uids=uids, weights=weights, netuid=netuid)
+            if self.weight_submitter is not None:
+                self.weight_submitter.submit(weighted_scores)
+            else:
+                client.vote(key=key, uids=uids, weights=weights, netuid=netuid)
 
         logger.info("Set weights", action="set_weight", timestamp=datetime.utcnow().isoformat(), weighted_scores=weighted_scores)
 
+    async def warm_up(self) -> None:
+        self.scored_tweet_ids = await self.miner_receipt_manager.get_all_scored_tweet_ids()
+        logger.info(f"Loaded scored tweets", scored_tweets=len(self.scored_tweet_ids))
+
+        await self.miner_receipt_manager.load_similarity_index()
+        await self.miner_blacklist.load()
+
+    def create_scheduler(self, settings: ValidatorSettings) -> StepScheduler:
+        scheduler = StepScheduler(
+            interval=settings.ITERATION_INTERVAL,
+            align=settings.SCHEDULE_ALIGN,
+            overrun=settings.SCHEDULE_OVERRUN,
+            block_time=settings.BLOCK_TIME,
+            get_block_number=self.metagraph_cache.get_block_number if settings.SCHEDULE_ALIGN == SCHEDULE_ALIGN_BLOCK else None,
+            shutdown_grace=settings.SHUTDOWN_GRACE_PERIOD,
+        )
+        # Fetched shortly before the next step, so it starts from a snapshot younger than METAGRAPH_MAX_AGE
+        scheduler.add_maintenance("metagraph", self.metagraph_cache.refresh, before_tick=settings.METAGRAPH_REFRESH_LEAD)
+        scheduler.add_maintenance("similarity_index", self.miner_receipt_manager.expire_similarity_index)
+        scheduler.add_maintenance("miner_blacklist", self.miner_blacklist.remove_expired)
+        return scheduler
+
+    def stop(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
     async def validation_loop(self, settings: ValidatorSettings) -> None:
-        while not self.terminate_event.is_set():
-            start_time = time.time()
-            await self.validate_step(self.netuid, settings)
-            if self.terminate_event.is_set():
-                logger.info("Terminating validation loop")
-                break
-
-            elapsed = time.time() - start_time
-            if elapsed < settings.ITERATION_INTERVAL:
-                sleep_time = settings.ITERATION_INTERVAL - elapsed
-                logger.info(f"Sleeping for {sleep_time}")
-                self.terminate_event.wait(sleep_time)
-                if self.terminate_event.is_set():
-                    logger.info("Terminating validation loop")
-                    break
+        if self.scheduler is None:
+            self.scheduler = self.create_scheduler(settings)
+
+        await self.warm_up()
+        await self.scheduler.run(partial(self.validate_step, self.netuid, settings))
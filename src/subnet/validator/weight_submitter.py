@@ -0,0 +1,104 @@
+import threading
+import time
+import traceback
+from typing import Optional
+from communex.client import CommuneClient  # type: ignore
+from loguru import logger
+from substrateinterface import Keypair  # type: ignore
+
+
+class WeightSubmitter:
+    """
+    Votes weights on chain from a dedicated worker thread, so validation steps never wait on the node.
+
+    Only the latest submitted vector is kept: a vector submitted while an older one is still waiting or
+    retrying replaces it. A vector equal to the last one voted is skipped. Failed votes are retried with
+    exponential backoff, up to `max_retries` times.
+    """
+
+    def __init__(self, client: CommuneClient, key: Keypair, netuid: int, max_retries: int = 5, backoff: float = 2.0, max_backoff: float = 60.0):
+        self.client = client
+        self.key = key
+        self.netuid = netuid
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._pending: Optional[dict[int, int]] = None
+        self._last_voted: Optional[dict[int, int]] = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.submitted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_latency: Optional[float] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="weight-submitter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, weighted_scores: dict[int, int]):
+        with self._condition:
+            self._pending = dict(weighted_scores)
+            self._condition.notify_all()
+
+    def _take_pending(self) -> Optional[dict[int, int]]:
+        with self._condition:
+            while self._pending is None and not self._stop_event.is_set():
+                self._condition.wait()
+            weighted_scores, self._pending = self._pending, None
+            return weighted_scores
+
+    def _run(self):
+        while True:
+            weighted_scores = self._take_pending()
+            if weighted_scores is None:
+                # Stopped with nothing left to vote
+                return
+            self._vote(weighted_scores)
+
+    def _vote(self, weighted_scores: dict[int, int]):
+        if weighted_scores == self._last_voted:
+            self.skipped += 1
+            logger.info(f"Weights did not change since the last vote, skipping", skipped=self.skipped)
+            return
+
+        uids = list(weighted_scores.keys())
+        weights = list(weighted_scores.values())
+        start_time = time.time()
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                self.client.vote(key=self.key, uids=uids, weights=weights, netuid=self.netuid)
+                self.last_latency = time.time() - start_time
+                self._last_voted = weighted_scores
+                self.submitted += 1
+                logger.info(f"Voted weights", latency=round(self.last_latency, 3), attempts=attempt, submitted=self.submitted)
+                return
+            except Exception as e:
+                logger.error(f"Failed to vote weights", attempt=attempt, error=e, traceback=traceback.format_exc())
+
+            if attempt > self.max_retries or self._stop_event.is_set():
+                break
+
+            delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+            with self._condition:
+                # Wakes up early when newer weights arrive or the submitter stops
+                self._condition.wait_for(lambda: self._pending is not None or self._stop_event.is_set(), timeout=delay)
+                if self._pending is not None:
+                    logger.info(f"Newer weights were submitted, dropping the failed vote")
+                    return
+
+        self.failed += 1
+        logger.error(f"Giving up voting weights", failed=self.failed)
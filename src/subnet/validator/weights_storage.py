@@ -1,29 +1,191 @@
+import io
 import os
 import pickle
+import shutil
+import struct
+import zlib
+from typing import Optional
 from loguru import logger
 
+# magic, format version, number of weights, crc32 of the payload
+WEIGHTS_MAGIC = b"MSWT"
+WEIGHTS_FORMAT_VERSION = 1
+WEIGHTS_HEADER = struct.Struct("<4sHII")
+
+
+class WeightsFormatError(Exception):
+    pass
+
+
+class _WeightsUnpickler(pickle.Unpickler):
+    """Loads weights files written by older versions, which only ever pickled a dict of ints."""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Global {module}.{name} is not allowed in a weights file")
+
+
+def encode_weights(weighted_scores: dict[int, int]) -> bytes:
+    uids = list(weighted_scores.keys())
+    weights = list(weighted_scores.values())
+    payload = struct.pack(f"<{len(uids)}I", *uids) + struct.pack(f"<{len(weights)}q", *weights)
+    return WEIGHTS_HEADER.pack(WEIGHTS_MAGIC, WEIGHTS_FORMAT_VERSION, len(uids), zlib.crc32(payload)) + payload
+
+
+def decode_weights(data: bytes) -> dict[int, int]:
+    if not data.startswith(WEIGHTS_MAGIC):
+        # Written by an older version
+        weighted_scores = _WeightsUnpickler(io.BytesIO(data)).load()
+        if not isinstance(weighted_scores, dict):
+            raise WeightsFormatError("Pickled weights are not a dict")
+        return {int(uid): int(weight) for uid, weight in weighted_scores.items()}
+
+    if len(data) < WEIGHTS_HEADER.size:
+        raise WeightsFormatError("Truncated weights header")
+
+    _, version, count, checksum = WEIGHTS_HEADER.unpack_from(data)
+    if version != WEIGHTS_FORMAT_VERSION:
+        raise WeightsFormatError(f"Unsupported weights format version {version}")
+
+    payload = data[WEIGHTS_HEADER.size:]
+    if len(payload) != count * 12 or zlib.crc32(payload) != checksum:
+        raise WeightsFormatError("Corrupted weights payload")
+
+    uids = struct.unpack_from(f"<{count}I", payload)
+    weights = struct.unpack_from(f"<{count}q", payload, count * 4)
+    return dict(zip(uids, weights))
+
 
 class WeightsStorage:
+    """
+    Last submitted weights, in a compact binary file with a checksummed header.
 
-    def __init__(self, weights_file_name):
+    Writes go to a temporary file which is fsynced and atomically renamed over the previous one, so a crash
+    leaves either the old or the new weights, never a torn file. The previous `history_size` files are kept
+    as `<name>.1` (newest) to `<name>.N` for `rollback`. Pickle files from older versions are still read.
+    Weights are cached in memory after the first read.
+    """
+
+    def __init__(self, weights_file_name, history_size: int = 5):
         self.weights_file_name = weights_file_name
+        self.history_size = history_size
+        self._weights: Optional[dict[int, int]] = None
+
+    def _history_file_name(self, index: int) -> str:
+        return f"{self.weights_file_name}.{index}"
+
+    @staticmethod
+    def _fsync_directory(path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _write_atomic(self, weighted_scores: dict[int, int]):
+        temp_file_name = f"{self.weights_file_name}.tmp"
+        with open(temp_file_name, 'wb') as file:
+            file.write(encode_weights(weighted_scores))
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._rotate_history()
+        os.replace(temp_file_name, self.weights_file_name)
+        self._fsync_directory(self.weights_file_name)
+
+    def _rotate_history(self):
+        if self.history_size <= 0 or not os.path.exists(self.weights_file_name):
+            return
+
+        for index in range(self.history_size - 1, 0, -1):
+            if os.path.exists(self._history_file_name(index)):
+                os.replace(self._history_file_name(index), self._history_file_name(index + 1))
+
+        # Link rather than rename, the current file must exist until the new one replaces it
+        latest_history_file_name = self._history_file_name(1)
+        if os.path.exists(latest_history_file_name):
+            os.remove(latest_history_file_name)
+        try:
+            os.link(self.weights_file_name, latest_history_file_name)
+        except OSError:
+            shutil.copy2(self.weights_file_name, latest_history_file_name)
+
+    @staticmethod
+    def _read_file(file_name: str) -> dict[int, int]:
+        with open(file_name, 'rb') as file:
+            return decode_weights(file.read())
 
     def setup(self):
+        if self._weights is not None:
+            return
+
         if not os.path.exists(self.weights_file_name):
-            with open(self.weights_file_name, 'wb') as file:
-                pickle.dump({}, file)
+            # Restore the latest history, if any, rather than forgetting the weights
+            self._write_atomic(self._read_latest_history())
             logger.debug(f"Created file: {self.weights_file_name}")
 
     def store(self, weighted_scores: dict[int, int]):
-        with open(self.weights_file_name, 'wb') as file:
-            pickle.dump(weighted_scores, file)
+        self._write_atomic(weighted_scores)
+        self._weights = dict(weighted_scores)
         logger.debug(f"Stored weights to {self.weights_file_name}")
 
     def read(self) -> dict[int, int]:
+        if self._weights is not None:
+            return dict(self._weights)
+
         if not os.path.exists(self.weights_file_name):
-            logger.debug(f"File {self.weights_file_name} does not exist, returning empty dictionary")
-            return {}
-        with open(self.weights_file_name, 'rb') as file:
-            data = pickle.load(file)
+            # Only happens when the file was removed from outside, the current file always exists once set up
+            logger.debug(f"File {self.weights_file_name} does not exist, reading the latest history")
+            return self._read_latest_history()
+
+        try:
+            data = self._read_file(self.weights_file_name)
+        except Exception as e:
+            logger.error(f"Failed to read weights, falling back to history", error=e, file=self.weights_file_name)
+            data = self._read_latest_history()
+
+        self._weights = data
         logger.debug(f"Read weights from {self.weights_file_name}")
-        return data
+        return dict(data)
+
+    def _read_latest_history(self) -> dict[int, int]:
+        for index in range(1, self.history_size + 1):
+            file_name = self._history_file_name(index)
+            if not os.path.exists(file_name):
+                continue
+            try:
+                return self._read_file(file_name)
+            except Exception as e:
+                logger.error(f"Failed to read weights history", error=e, file=file_name)
+        return {}
+
+    def read_history(self) -> list[dict[int, int]]:
+        """Past weights, newest first, skipping unreadable files."""
+        history = []
+        for index in range(1, self.history_size + 1):
+            file_name = self._history_file_name(index)
+            if not os.path.exists(file_name):
+                continue
+            try:
+                history.append(self._read_file(file_name))
+            except Exception as e:
+                logger.error(f"Failed to read weights history", error=e, file=file_name)
+        return history
+
+    def rollback(self, steps: int = 1) -> dict[int, int]:
+        """
+        Makes the weights stored `steps` writes ago current again, storing them as a new write.
+        """
+        history = self.read_history()
+        if steps < 1 or steps > len(history):
+            raise ValueError(f"Can not roll back {steps} steps, {len(history)} past weights are kept")
+
+        weighted_scores = history[steps - 1]
+        self.store(weighted_scores)
+        logger.info(f"Rolled back weights", steps=steps, weighted_scores=weighted_scores)
+        return weighted_scores
@@ -0,0 +1,52 @@
+from src.subnet.protocol import TwitterPost, TwitterPostsPage
+from src.subnet.validator.miner_state import MinerStateCache
+
+
+def posts(*tweet_ids):
+    return [TwitterPost(user_id="u", tweet_id=tweet_id) for tweet_id in tweet_ids]
+
+
+def exhausted_cache():
+    cache = MinerStateCache()
+    cache.store("m", posts("1", "2"))
+    return cache
+
+
+def test_unchanged_answer_without_new_posts_is_reused():
+    assert exhausted_cache().get_unchanged("m", posts("1", "2")) is not None
+
+
+def test_leftover_backlog_is_challenged():
+    # Only 1 of the miner's posts was scored, nothing was stored so 2 and 3 are still challenged
+    cache = MinerStateCache()
+    assert cache.get_unchanged("m", posts("1", "2", "3")) is None
+    assert cache.get_unchanged("m", posts("1", "2", "3")) is None
+
+
+def test_empty_answer_is_not_reused():
+    assert exhausted_cache().get_unchanged("m", []) is None
+
+
+def test_changed_answer_is_not_reused():
+    assert exhausted_cache().get_unchanged("m", posts("2")) is None
+    assert exhausted_cache().get_unchanged("m", posts("2", "1")) is None
+
+
+def test_new_post_is_not_reused():
+    assert exhausted_cache().get_unchanged("m", posts("1", "2", "3")) is None
+
+
+def test_discarded_state_is_not_reused():
+    cache = exhausted_cache()
+    cache.discard("m")
+    assert cache.get_unchanged("m", posts("1", "2")) is None
+
+
+def test_paginated_feed_keeps_unscored_posts():
+    cache = MinerStateCache()
+    feed = cache.get_feed("m")
+    feed.extend(TwitterPostsPage(posts=[["u", "1"], ["u", "2"]], cursor="c1"))
+    feed.prune({"1"})
+
+    assert [post.tweet_id for post in feed.posts] == ["2"]
+    assert feed.cursor == "c1"